@@ -0,0 +1,292 @@
+import re
+import sys
+import json
+import time
+import random
+import argparse
+import resource
+import platform
+import subprocess
+import multiprocessing
+from Testdaten_Generator import TestDataGenerator, EXPORT_FORMATS, available_data_types
+from Testdaten_API import MAX_RECORDS, app, result_cache
+
+# Anzahl der Datensätze pro Messung
+NUM_RECORDS = 5000
+# Datensatzanzahlen für die API-Messungen
+API_SIZES = [10, 1000, MAX_RECORDS]
+# Wiederholungen je API-Messung
+API_REPEATS = 3
+# Erlaubte Verschlechterung gegenüber der Baseline, bevor eine Messung als Regression gilt
+TOLERANCE = 0.2
+
+# Richtung der Metriken: 1 = höher ist besser, -1 = niedriger ist besser
+METRIC_DIRECTIONS = {
+    'datensaetze_pro_sek': 1,
+    'mb_pro_sek': 1,
+    'p50_us': -1,
+    'p90_us': -1,
+    'p99_us': -1,
+    'mittel_ms': -1,
+    'p95_ms': -1,
+    'peak_rss_mb': -1,
+    'verwerfungsrate': -1,
+    'us_pro_datensatz': -1,
+    'import_ms': -1,
+}
+# Wiederholungen der Kaltstart-Messung
+STARTUP_REPEATS = 5
+
+
+# Bisherige Implementierungen (Verwerfen und Neuversuchen) als Vergleichsbasis
+def legacy_generate_username(fake, stats):
+    while True:
+        stats['attempts'] += 1
+        username = re.sub(r'[^a-zA-Z0-9ÄÖÜäöü]', '', fake.user_name())
+        if 4 <= len(username) <= 12:
+            return username
+
+
+def legacy_generate_password(fake, stats):
+    while True:
+        stats['attempts'] += 1
+        password = fake.password(
+            length=random.randint(8, 20),
+            special_chars=True,
+            digits=True,
+            upper_case=True,
+            lower_case=True
+        )
+        if (
+                8 <= len(password) <= 20 and
+                re.match(r'^[a-zA-Z0-9@$!%*?]+$', password) and
+                re.search(r'[a-z]', password) and
+                re.search(r'[A-Z]', password) and
+                re.search(r'\d', password) and
+                re.search(r'[@$!%*?]', password)
+        ):
+            return password
+
+
+def measure(func, num_records):
+    # Liefert die Kosten pro Datensatz in Mikrosekunden
+    start = time.perf_counter()
+    for _ in range(num_records):
+        func()
+    return (time.perf_counter() - start) / num_records * 1e6
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def result(suite, name, **metrics):
+    return {'suite': suite, 'name': name, 'metrics': metrics}
+
+
+def benchmark_credentials(generator, num_records=NUM_RECORDS):
+    # Verwerfungsrate und Kosten der alten Schleifen im Vergleich zur Konstruktion per Design
+    results = []
+    for name, legacy, current in (
+            ('benutzername', legacy_generate_username, generator.generate_username),
+            ('passwort', legacy_generate_password, generator.generate_password)):
+        stats = {'attempts': 0}
+        legacy_cost = measure(lambda: legacy(generator.fake, stats), num_records)
+        results.append(result('credentials', f'{name}_vorher',
+                              verwerfungsrate=1 - num_records / stats['attempts'],
+                              us_pro_datensatz=legacy_cost))
+        results.append(result('credentials', f'{name}_nachher', verwerfungsrate=0.0,
+                              us_pro_datensatz=measure(current, num_records)))
+    return results
+
+
+def benchmark_generators(generator, num_records=NUM_RECORDS):
+    # Durchsatz und Latenz-Perzentile je Datensatz für alle Einzel-Generatoren
+    results = []
+    methods = {
+        'generate_username': generator.generate_username,
+        'generate_username_ungültig': lambda: generator.generate_username(valid=False),
+        'generate_password': generator.generate_password,
+        'generate_email': generator.generate_email,
+        'generate_bestellung': generator.generate_bestellung,
+        'generate_registration': generator.generate_registration,
+        'generate_login': generator.generate_login,
+        'generate_profile': generator.generate_profile,
+    }
+    for name, method in methods.items():
+        latencies = []
+        start = time.perf_counter()
+        for _ in range(num_records):
+            call_start = time.perf_counter_ns()
+            method()
+            latencies.append((time.perf_counter_ns() - call_start) / 1000)
+        elapsed = time.perf_counter() - start
+        results.append(result('generator', name,
+                              datensaetze_pro_sek=num_records / elapsed,
+                              p50_us=percentile(latencies, 0.5),
+                              p90_us=percentile(latencies, 0.9),
+                              p99_us=percentile(latencies, 0.99)))
+
+    # Batch-Generierung: Pools einmalig aufwärmen, dann spaltenweise messen (ungültig inkl. Mutation)
+    batch_size = max(num_records, 100000)
+    for data_type in available_data_types():
+        generator.generate_batch(data_type, 10)
+        for valid, suffix in ((True, ''), (False, '_ungültig')):
+            start = time.perf_counter()
+            generator.generate_batch(data_type, batch_size, valid=valid)
+            results.append(result('generator', f'generate_batch_{data_type}{suffix}',
+                                  datensaetze_pro_sek=batch_size / (time.perf_counter() - start)))
+    return results
+
+
+def benchmark_api(sizes=API_SIZES, repeats=API_REPEATS):
+    # Ende-zu-Ende-Messung von /generate über den TestClient (ohne Cache, da ohne Seed).
+    # Der Client läuft im Kontextmanager, damit alle Anfragen denselben Event-Loop-Thread und damit dieselben
+    # Worker-Threads mit ihren Generatoren nutzen; ohne `with` würde je Anfrage Faker neu aufgebaut
+    from fastapi.testclient import TestClient
+    results = []
+    with TestClient(app) as client:
+        for data_type in available_data_types():
+            client.get(f'/generate/{data_type}/1')
+        for data_type in available_data_types():
+            for size in sizes:
+                durations = []
+                for _ in range(repeats):
+                    start = time.perf_counter()
+                    response = client.get(f'/generate/{data_type}/{size}')
+                    durations.append((time.perf_counter() - start) * 1000)
+                    if response.status_code != 200:
+                        raise RuntimeError(f'/generate/{data_type}/{size} lieferte {response.status_code}')
+                results.append(result('api', f'{data_type}_{size}',
+                                      datensaetze_pro_sek=size / (sum(durations) / len(durations) / 1000),
+                                      mittel_ms=sum(durations) / len(durations),
+                                      p95_ms=percentile(durations, 0.95)))
+    result_cache.clear()
+    return results
+
+
+def benchmark_startup(repeats=STARTUP_REPEATS):
+    # Kaltstart: Importzeit der API bzw. der Streamlit-Oberfläche in jeweils frischen Prozessen
+    results = []
+    for name, module in (('api', 'Testdaten_API'), ('ui', 'Bench_Projekt_API')):
+        code = f'import time; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)'
+        durations = []
+        for _ in range(repeats):
+            output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+            durations.append(float(output.split()[-1]) * 1000)
+        results.append(result('start', name, import_ms=percentile(durations, 0.5)))
+    return results
+
+
+def _reset_peak_rss():
+    # Ein per fork gestarteter Prozess kann den Spitzen-RSS des Elternprozesses erben; unter Linux lässt
+    # er sich auf den aktuellen RSS zurücksetzen (sonst bleibt nur die Differenz zum geerbten Wert)
+    try:
+        with open('/proc/self/clear_refs', 'w') as file:
+            file.write('5')
+    except OSError:
+        pass
+
+
+def _export_worker(df, format, connection):
+    # Läuft in einem eigenen Prozess, damit der Spitzenspeicher je Format getrennt gemessen wird;
+    # gemeldet wird der Anstieg des Spitzen-RSS während des Exports, nicht der Stand vor dem Export
+    generator = TestDataGenerator()
+    _reset_peak_rss()
+    rss_before_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    data = generator.export_data(df, format)
+    elapsed = time.perf_counter() - start
+    peak_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before_kb
+    connection.send((elapsed, len(data), peak_rss_kb))
+    connection.close()
+
+
+def benchmark_exports(generator, num_records=NUM_RECORDS):
+    # Durchsatz und zusätzlicher Spitzenspeicher (Anstieg des RSS im Export-Prozess) je Exportformat
+    df = generator.generate_batch('profil', num_records)
+    context = multiprocessing.get_context('fork')
+    results = []
+    for format in EXPORT_FORMATS:
+        receiver, sender = context.Pipe(duplex=False)
+        process = context.Process(target=_export_worker, args=(df, format, sender))
+        process.start()
+        elapsed, size, peak_rss_kb = receiver.recv()
+        process.join()
+        results.append(result('export', format,
+                              datensaetze_pro_sek=num_records / elapsed,
+                              mb_pro_sek=size / elapsed / 1e6,
+                              peak_rss_mb=peak_rss_kb / 1024))
+    return results
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    # Liefert alle Metriken, die sich gegenüber der Baseline um mehr als `tolerance` verschlechtert haben
+    baseline_metrics = {(entry['suite'], entry['name']): entry['metrics'] for entry in baseline['results']}
+    regressions = []
+    for entry in results:
+        reference = baseline_metrics.get((entry['suite'], entry['name']))
+        if reference is None:
+            continue
+        for metric, value in entry['metrics'].items():
+            direction = METRIC_DIRECTIONS.get(metric)
+            old = reference.get(metric)
+            if direction is None or not old:
+                continue
+            change = (value - old) / old * direction
+            if change < -tolerance:
+                regressions.append({'suite': entry['suite'], 'name': entry['name'], 'metrik': metric,
+                                    'baseline': old, 'aktuell': value, 'änderung': change})
+    return regressions
+
+
+def print_results(results):
+    for entry in results:
+        metrics = ', '.join(f'{metric}={value:.4g}' for metric, value in entry['metrics'].items())
+        print(f"{entry['suite']:<12}{entry['name']:<32}{metrics}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmarks für Generatoren, API und Exporte')
+    parser.add_argument('--records', type=int, default=NUM_RECORDS, help='Datensätze pro Messung')
+    parser.add_argument('--suites', default='start,credentials,generator,api,export',
+                        help='Kommagetrennte Auswahl der Messreihen')
+    parser.add_argument('--output', help='Ergebnisse als JSON in diese Datei schreiben')
+    parser.add_argument('--baseline', help='Ergebnisse mit dieser gespeicherten JSON-Datei vergleichen')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE,
+                        help='Erlaubte relative Verschlechterung gegenüber der Baseline')
+    args = parser.parse_args()
+
+    generator = TestDataGenerator()
+    suites = args.suites.split(',')
+    results = []
+    if 'start' in suites:
+        results += benchmark_startup()
+    if 'credentials' in suites:
+        results += benchmark_credentials(generator, args.records)
+    if 'generator' in suites:
+        results += benchmark_generators(generator, args.records)
+    if 'api' in suites:
+        results += benchmark_api()
+    if 'export' in suites:
+        results += benchmark_exports(generator, args.records)
+    print_results(results)
+
+    report = {
+        'zeitpunkt': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'datensaetze': args.records,
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression['suite']}/{regression['name']} {regression['metrik']}: "
+                  f"{regression['baseline']:.4g} -> {regression['aktuell']:.4g} ({regression['änderung']:+.1%})")
+        sys.exit(1 if regressions else 0)
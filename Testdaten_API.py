@@ -0,0 +1,551 @@
+import os
+import time
+import uuid
+import json
+import gzip
+import zlib
+import asyncio
+import hashlib
+import tempfile
+from functools import partial
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Optional
+from fastapi import FastAPI, HTTPException, Header, Request
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse, Response, PlainTextResponse
+from pydantic import BaseModel
+from Testdaten_Generator import (SUPPORTED_LOCALES, MAX_WORKERS, SHARD_SIZE, EXPORT_FORMATS, COLUMNAR_FORMATS,
+                                 schemas, available_data_types, get_generator, parse_locales, check_compression,
+                                 iter_shards, generate_records, dumps_json, string_columns)
+import Testdaten_Metriken
+from Testdaten_Metriken import (timed, start_stages, server_timing, render_metrics, profiler, SERIALIZATION_SECONDS,
+                                COMPRESSION_SECONDS, GENERATION_SECONDS, JOB_SECONDS, REQUEST_SECONDS)
+
+# Eigenständiger Einstiegspunkt der API: importiert weder Streamlit noch die UI
+
+# Optionale Abhängigkeit für zstd-komprimierte Antworten; ohne zstandard wird nur gzip angeboten
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class FastJSONResponse(JSONResponse):
+    # Standard-Antwortklasse der API: serialisiert mit dumps_json statt json.dumps
+    def render(self, content):
+        return dumps_json(content)
+
+
+# Initialisiere FastAPI
+app = FastAPI(default_response_class=FastJSONResponse)
+
+# Obergrenze für nicht gestreamte Anfragen (alles wird im Speicher gehalten)
+MAX_RECORDS = 10000
+# Unterstützte Streaming-Formate und deren Media-Types
+STREAM_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+    'json': 'application/json',
+    'xml': 'application/xml'
+}
+# Anzahl gleichzeitig laufender Hintergrund-Jobs
+JOB_THREADS = 4
+# Aufbewahrungsdauer abgeschlossener Jobs in Sekunden
+JOB_TTL = 3600
+# Ergebnis-Cache für Anfragen mit Seed: Größe im Speicher, optionales Verzeichnis und dessen Größe
+CACHE_MAX_BYTES = int(os.environ.get('TESTDATEN_CACHE_BYTES', 256 * 1024 * 1024))
+CACHE_DIR = os.environ.get('TESTDATEN_CACHE_DIR')
+CACHE_DISK_MAX_BYTES = int(os.environ.get('TESTDATEN_CACHE_DISK_BYTES', 4 * 1024 * 1024 * 1024))
+# Temporäre Cache-Dateien, die älter sind, gelten als Reste abgebrochener Schreibvorgänge (Sekunden)
+CACHE_TMP_MAX_AGE = 600
+# Wird bei Änderungen an den Generatoren erhöht, damit alte Cache-Einträge und ETags ungültig werden
+CACHE_VERSION = 9
+# Antworten ab dieser Größe werden komprimiert, sofern der Client es per Accept-Encoding erlaubt
+COMPRESS_MIN_BYTES = 1024
+# Kompressionsstufen: niedrig genug, dass die Kompression schneller ist als die eingesparte Übertragung
+GZIP_LEVEL = 5
+ZSTD_LEVEL = 3
+
+
+@app.middleware("http")
+async def measure_request(request: Request, call_next):
+    # Dauer je Endpunkt für /metrics; auf Wunsch die Zeiten der einzelnen Schritte als Server-Timing-Header
+    stages = start_stages()
+    start = time.perf_counter()
+    response = await call_next(request)
+    elapsed = time.perf_counter() - start
+    route = request.scope.get('route')
+    REQUEST_SECONDS.observe(elapsed, pfad=route.path if route is not None else 'unbekannt', methode=request.method,
+                            status=response.status_code)
+    if Testdaten_Metriken.SERVER_TIMING or request.headers.get('X-Server-Timing') == '1':
+        response.headers['Server-Timing'] = server_timing(stages, elapsed)
+    return response
+
+
+@app.get("/")
+def read_root():
+    return {"message": "Willkommen zur Testdaten-API! Verfügbare Endpunkte: /generate/{data_type}/{num_records}"}
+
+
+# Ergebnis-Cache: bei gleichem Seed sind die Ergebnisse deterministisch und können
+# als serialisierte Bytes wiederverwendet werden
+def cache_key(**params):
+    payload = json.dumps({'version': CACHE_VERSION, **params}, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    # LRU-Cache mit Größenbudget im Speicher, optional zusätzlich auf der Festplatte
+    def __init__(self, max_bytes=CACHE_MAX_BYTES, directory=None, disk_max_bytes=CACHE_DISK_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.disk_max_bytes = disk_max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.lock = Lock()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f'{key}.bin')
+
+    def get(self, key):
+        with self.lock:
+            data = self.entries.get(key)
+            if data is not None:
+                self.entries.move_to_end(key)
+                return data
+        if self.directory is None:
+            return None
+        try:
+            with open(self._path(key), 'rb') as file:
+                data = file.read()
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(self._path(key))
+        except FileNotFoundError:
+            # Zwischen Lesen und Zugriffszeit von einem anderen Prozess verdrängt; die Daten sind gültig
+            pass
+        self._put_memory(key, data)
+        return data
+
+    def put(self, key, data):
+        self._put_memory(key, data)
+        if self.directory is not None:
+            self._put_disk(key, data)
+
+    def _put_memory(self, key, data):
+        if len(data) > self.max_bytes:
+            return
+        with self.lock:
+            if key in self.entries:
+                self.size -= len(self.entries.pop(key))
+            self.entries[key] = data
+            self.size += len(data)
+            while self.size > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def _put_disk(self, key, data):
+        # Atomar schreiben, damit parallele Leser nie eine halbe Datei sehen
+        with tempfile.NamedTemporaryFile(dir=self.directory, delete=False, suffix='.tmp') as file:
+            try:
+                file.write(data)
+            except BaseException:
+                file.close()
+                os.remove(file.name)
+                raise
+        os.replace(file.name, self._path(key))
+        # Älteste Einträge (nach letztem Zugriff) entfernen, bis das Budget eingehalten ist. Andere Prozesse
+        # mit demselben Verzeichnis verdrängen gleichzeitig, Dateien können also jederzeit verschwinden
+        now = time.time()
+        files = []
+        for entry in os.scandir(self.directory):
+            try:
+                stat = entry.stat()
+                if entry.name.endswith('.bin'):
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+                elif entry.name.endswith('.tmp') and now - stat.st_mtime > CACHE_TMP_MAX_AGE:
+                    # Reste abgebrochener Schreibvorgänge (z.B. beendeter Worker-Prozess)
+                    os.remove(entry.path)
+            except FileNotFoundError:
+                continue
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.disk_max_bytes:
+                break
+            total -= size
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+
+result_cache = ResultCache(directory=CACHE_DIR)
+
+
+def cached_stream(chunks, key):
+    # Reicht die Chunks durch und legt das vollständige Ergebnis anschließend im Cache ab
+    collected = []
+    for chunk in chunks:
+        collected.append(chunk)
+        yield chunk
+    result_cache.put(key, b''.join(collected))
+
+
+# Komprimierung der Antworten, ausgehandelt über den Accept-Encoding-Header
+def negotiate_encoding(accept_encoding):
+    # Liefert 'zstd', 'gzip' oder None; zstd wird bevorzugt, wenn der Client es gleichwertig akzeptiert
+    offered = {}
+    for part in (accept_encoding or '').split(','):
+        name, _, params = part.strip().partition(';')
+        quality = 1.0
+        if params.strip().startswith('q='):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                continue
+        offered[name.strip().lower()] = quality
+    candidates = ['zstd', 'gzip'] if zstandard is not None else ['gzip']
+    ranked = [(offered.get(name, offered.get('*', 0)), -index, name) for index, name in enumerate(candidates)]
+    quality, _, name = max(ranked)
+    return name if quality > 0 else None
+
+
+def compress(data, encoding):
+    if encoding == 'zstd':
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def compress_stream(chunks, encoding):
+    # Komprimiert einen Chunk-Strom fortlaufend, ohne die gesamte Ausgabe zu puffern
+    if encoding == 'zstd':
+        compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+        flush = partial(compressor.flush, zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+    else:
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        flush = partial(compressor.flush, zlib.Z_SYNC_FLUSH)
+    for chunk in chunks:
+        # Nach jedem Chunk leeren, damit der Client die Daten sofort erhält
+        yield compressor.compress(chunk) + flush()
+    yield compressor.flush()
+
+
+def encoded_response(content, media_type, accept_encoding, headers=None, status_code=200):
+    # Antwort mit fertigem Inhalt, komprimiert, sobald sie groß genug ist und der Client es unterstützt
+    headers = {**(headers or {}), 'Vary': 'Accept-Encoding'}
+    encoding = negotiate_encoding(accept_encoding) if len(content) >= COMPRESS_MIN_BYTES else None
+    if encoding is not None:
+        with timed(COMPRESSION_SECONDS, 'kompression', kodierung=encoding):
+            content = compress(content, encoding)
+        headers['Content-Encoding'] = encoding
+    return Response(content=content, media_type=media_type, headers=headers, status_code=status_code)
+
+
+def encoded_stream(chunks, media_type, accept_encoding, headers=None):
+    headers = {**(headers or {}), 'Vary': 'Accept-Encoding'}
+    encoding = negotiate_encoding(accept_encoding)
+    if encoding is not None:
+        chunks = compress_stream(chunks, encoding)
+        headers['Content-Encoding'] = encoding
+    return StreamingResponse(chunks, media_type=media_type, headers=headers)
+
+
+def etag_matches(etag, if_none_match):
+    # Schwacher Vergleich (RFC 9110): ein W/-Präfix wird auf beiden Seiten ignoriert
+    def opaque(tag):
+        return tag[2:] if tag.startswith('W/') else tag
+
+    tags = [value.strip() for value in if_none_match.split(',')]
+    return '*' in tags or opaque(etag) in [opaque(tag) for tag in tags]
+
+
+# API-Endpoints
+def tagged_records(valid_records, invalid_records):
+    # Verschränkt gültige und ungültige Datensätze und kennzeichnet sie mit der Spalte 'gültig';
+    # 'verletzte_regel' steht in allen Zeilen, damit CSV und xlsx eine einheitliche Kopfzeile haben
+    for valid_record, invalid_record in zip(valid_records, invalid_records):
+        yield {'gültig': True, **valid_record, 'verletzte_regel': None}
+        record = {'gültig': False, **invalid_record}
+        record.setdefault('verletzte_regel', None)
+        yield record
+
+
+def stream_records(data_type, num_records, stream_format, seed=None, workers=1, locales=None):
+    # Erzeugt die Datensätze shardweise und serialisiert sie chunkweise, damit der Speicherbedarf konstant bleibt
+    def records():
+        for valid_records, invalid_records in iter_shards(data_type, num_records, seed, workers, locales=locales):
+            yield from tagged_records(valid_records, invalid_records)
+
+    # Ein Chunk entspricht einem Shard (gültige + ungültige Datensätze)
+    return get_generator(locales).iter_export(records(), stream_format, chunk_size=2 * SHARD_SIZE)
+
+
+def check_seed(seed):
+    # NumPy (SeedSequence/default_rng) akzeptiert nur nicht negative Seeds
+    if seed is not None and seed < 0:
+        raise HTTPException(status_code=400, detail="Der Seed darf nicht negativ sein.")
+
+
+def check_generation_params(data_type, num_records, workers, locale, seed=None):
+    # Gemeinsame Prüfung der Anfrageparameter; liefert die ausgewählten Locales
+    check_seed(seed)
+    if num_records <= 0:
+        raise HTTPException(status_code=400, detail="Keine Datensätze generiert! Die Anzahl der Datensätze muss größer als 0 sein.")
+    if not 1 <= workers <= MAX_WORKERS:
+        raise HTTPException(status_code=400, detail=f"Die Anzahl der Worker muss zwischen 1 und {MAX_WORKERS} liegen.")
+    if data_type not in available_data_types():
+        raise HTTPException(status_code=404, detail="Ungültiger Datentyp")
+    try:
+        return parse_locales(locale)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/generate/{data_type}/{num_records}")
+def generate_data_api(data_type: str, num_records: int, stream: Optional[str] = None, seed: Optional[int] = None,
+                      workers: int = 1, locale: Optional[str] = None, if_none_match: Optional[str] = Header(None),
+                      accept_encoding: Optional[str] = Header(None)):
+    if stream is not None and stream not in STREAM_FORMATS:
+        raise HTTPException(status_code=400, detail="Ungültiges Streaming-Format")
+    # Gestreamte Anfragen halten nie alle Datensätze im Speicher und sind daher nicht begrenzt
+    if stream is None and num_records > MAX_RECORDS:
+        raise HTTPException(status_code=400, detail="Number of records too large")
+    locales = check_generation_params(data_type, num_records, workers, locale, seed)
+
+    # Nur Anfragen mit Seed sind deterministisch; gestreamte nur bis MAX_RECORDS, damit der Cache begrenzt bleibt
+    key = None
+    if seed is not None and num_records <= MAX_RECORDS:
+        key = cache_key(data_type=data_type, num_records=num_records, seed=seed,
+                        locales=locales or SUPPORTED_LOCALES, format=stream or 'json',
+                        schema=schemas[data_type].digest if data_type in schemas else None)
+        # Schwacher ETag: gzip-, zstd- und unkomprimierte Antworten haben dasselbe ETag, sind aber nicht bytegleich
+        etag = f'W/"{key}"'
+        headers = {'ETag': etag}
+        media_type = STREAM_FORMATS[stream] if stream is not None else 'application/json'
+        if if_none_match is not None and etag_matches(etag, if_none_match):
+            return Response(status_code=304, headers=headers)
+        cached = result_cache.get(key)
+        if cached is not None:
+            return encoded_response(cached, media_type, accept_encoding, {**headers, 'X-Cache': 'HIT'})
+        headers['X-Cache'] = 'MISS'
+
+    if stream is not None:
+        chunks = stream_records(data_type, num_records, stream, seed, workers, locales)
+        if key is not None:
+            return encoded_stream(cached_stream(chunks, key), STREAM_FORMATS[stream], accept_encoding, headers)
+        return encoded_stream(chunks, STREAM_FORMATS[stream], accept_encoding)
+
+    valid_list, invalid_list = generate_records(data_type, num_records, seed, workers, locales=locales)
+
+    with timed(SERIALIZATION_SECONDS, 'serialisierung', format='json'):
+        body = dumps_json({"gültige_daten": valid_list, "ungültige_daten": invalid_list})
+    if key is not None:
+        result_cache.put(key, body)
+    return encoded_response(body, 'application/json', accept_encoding, headers if key is not None else None)
+
+
+@app.get("/generate_relational/{num_profiles}/{num_orders}")
+def generate_relational_api(num_profiles: int, num_orders: int, seed: Optional[int] = None, zipf: float = 1.1,
+                            locale: Optional[str] = None, unique: bool = False,
+                            accept_encoding: Optional[str] = Header(None)):
+    if num_profiles <= 0 or num_orders < 0:
+        raise HTTPException(status_code=400, detail="Es muss mindestens ein Profil generiert werden.")
+    if num_profiles + num_orders > MAX_RECORDS:
+        raise HTTPException(status_code=400, detail="Number of records too large")
+    if zipf < 0:
+        raise HTTPException(status_code=400, detail="Der Zipf-Exponent darf nicht negativ sein.")
+    check_seed(seed)
+    try:
+        locales = parse_locales(locale)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    generator = get_generator(locales, seed)
+    with timed(GENERATION_SECONDS, 'generierung', datentyp='relational', gueltig=True):
+        tables = generator.generate_relational(num_profiles, num_orders, zipf, unique=unique)
+    with timed(SERIALIZATION_SECONDS, 'serialisierung', format='json'):
+        body = dumps_json({name: table.to_dict(orient='records') for name, table in tables.items()})
+    return encoded_response(body, 'application/json', accept_encoding)
+
+
+# Hintergrund-Jobs für große Datenmengen
+class JobRequest(BaseModel):
+    data_type: str
+    num_records: int
+    format: str = 'json'
+    seed: Optional[int] = None
+    workers: int = 1
+    locale: Optional[str] = None
+    compression: Optional[str] = None
+    row_group_size: Optional[int] = None
+
+
+jobs = {}
+jobs_lock = Lock()
+job_executor = ThreadPoolExecutor(max_workers=JOB_THREADS, thread_name_prefix='testdaten-job')
+
+
+def job_status(job):
+    return {key: value for key, value in job.items() if key != 'datei'}
+
+
+def purge_jobs():
+    # Entfernt abgeschlossene Jobs nach Ablauf von JOB_TTL samt Ergebnisdatei
+    now = time.time()
+    with jobs_lock:
+        expired = [job for job in jobs.values()
+                   if job['beendet'] is not None and now - job['beendet'] > JOB_TTL]
+        for job in expired:
+            del jobs[job['id']]
+    for job in expired:
+        if job['datei'] is not None and os.path.exists(job['datei']):
+            os.remove(job['datei'])
+
+
+def run_job(job, request, locales):
+    # Läuft im Job-Executor; die Datensätze werden direkt in die Ergebnisdatei geschrieben
+    job['status'] = 'läuft'
+    start = time.perf_counter()
+
+    def records():
+        for valid_records, invalid_records in iter_shards(request.data_type, request.num_records, request.seed,
+                                                          request.workers, locales=locales):
+            yield from tagged_records(valid_records, invalid_records)
+            # Fortschritt nach jedem geschriebenen Shard aktualisieren
+            job['erzeugte_datensätze'] += len(valid_records)
+            job['fortschritt'] = round(job['erzeugte_datensätze'] / request.num_records, 4)
+
+    try:
+        with tempfile.NamedTemporaryFile(delete=False, prefix='testdaten_', suffix=f'.{request.format}') as file:
+            job['datei'] = file.name
+            get_generator(locales).export_stream(records(), request.format, file, compression=request.compression,
+                                                 row_group_size=request.row_group_size,
+                                                 string_columns=string_columns(request.data_type))
+        job['status'] = 'fertig'
+    except Exception as e:
+        job['status'] = 'fehlgeschlagen'
+        job['fehler'] = str(e)
+    finally:
+        job['beendet'] = time.time()
+        JOB_SECONDS.observe(time.perf_counter() - start, format=request.format, status=job['status'])
+
+
+@app.post("/jobs", status_code=202)
+async def create_job(request: JobRequest):
+    locales = check_generation_params(request.data_type, request.num_records, request.workers, request.locale,
+                                      request.seed)
+    if request.format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="Ungültiges Exportformat")
+    if request.compression is not None or request.row_group_size is not None:
+        if request.format not in COLUMNAR_FORMATS:
+            raise HTTPException(status_code=400, detail="Kompression und Row-Group-Größe gibt es nur für Parquet/Arrow/Feather")
+        try:
+            check_compression(request.format, request.compression)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if request.row_group_size is not None and request.row_group_size <= 0:
+            raise HTTPException(status_code=400, detail="Die Row-Group-Größe muss größer als 0 sein.")
+    purge_jobs()
+
+    job = {
+        'id': uuid.uuid4().hex,
+        'status': 'wartend',
+        'fortschritt': 0.0,
+        'erzeugte_datensätze': 0,
+        'data_type': request.data_type,
+        'num_records': request.num_records,
+        'format': request.format,
+        'seed': request.seed,
+        'fehler': None,
+        'erstellt': time.time(),
+        'beendet': None,
+        'datei': None
+    }
+    with jobs_lock:
+        jobs[job['id']] = job
+    # Die Generierung läuft im Executor, damit die Event-Loop für andere Anfragen frei bleibt
+    asyncio.get_running_loop().run_in_executor(job_executor, run_job, job, request, locales)
+    return job_status(job)
+
+
+def get_job(job_id):
+    with jobs_lock:
+        job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job nicht gefunden")
+    return job
+
+
+@app.get("/jobs/{job_id}")
+async def get_job_status(job_id: str):
+    return job_status(get_job(job_id))
+
+
+@app.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    job = get_job(job_id)
+    if job['status'] == 'fehlgeschlagen':
+        raise HTTPException(status_code=500, detail=f"Job fehlgeschlagen: {job['fehler']}")
+    if job['status'] != 'fertig':
+        raise HTTPException(status_code=409, detail="Job ist noch nicht abgeschlossen")
+    return FileResponse(job['datei'], media_type=EXPORT_FORMATS[job['format']],
+                        filename=f"{job['data_type']}_{job['id']}.{job['format']}")
+
+
+# Instrumentierung
+@app.get("/metrics")
+def get_metrics():
+    return PlainTextResponse(render_metrics(), media_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+def check_profiler():
+    if not Testdaten_Metriken.PROFILER_ENABLED:
+        raise HTTPException(status_code=404, detail="Profiler ist nicht freigeschaltet (TESTDATEN_PROFILER=1)")
+
+
+@app.post("/profiler/start")
+def start_profiler(intervall_ms: float = Testdaten_Metriken.PROFILER_INTERVAL * 1000):
+    # Startet die Abtastung aller Threads; bisherige Messwerte werden verworfen
+    check_profiler()
+    if intervall_ms <= 0:
+        raise HTTPException(status_code=400, detail="Das Intervall muss größer als 0 sein.")
+    if not profiler.start(intervall_ms / 1000):
+        raise HTTPException(status_code=409, detail="Profiler läuft bereits")
+    return {'status': 'läuft', 'intervall_ms': intervall_ms}
+
+
+@app.post("/profiler/stop")
+def stop_profiler():
+    check_profiler()
+    if not profiler.stop():
+        raise HTTPException(status_code=409, detail="Profiler läuft nicht")
+    return {'status': 'gestoppt', 'stacks': len(profiler.samples)}
+
+
+@app.get("/profiler")
+def get_profile():
+    # Abgetastete Stacks im collapsed-Format (z.B. für flamegraph.pl oder speedscope)
+    check_profiler()
+    return PlainTextResponse(profiler.collapsed())
+
+
+if __name__ == "__main__":
+    # Startet die API mit mehreren Worker-Prozessen, alternativ: gunicorn -c gunicorn.conf.py Testdaten_API:app
+    import argparse
+    import uvicorn
+    parser = argparse.ArgumentParser(description='Startet die Testdaten-API')
+    parser.add_argument('--host', default=os.environ.get('TESTDATEN_HOST', '127.0.0.1'))
+    parser.add_argument('--port', type=int, default=int(os.environ.get('TESTDATEN_PORT', 8000)))
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('WEB_CONCURRENCY', MAX_WORKERS)),
+                        help='Anzahl der Server-Prozesse')
+    args = parser.parse_args()
+    uvicorn.run('Testdaten_API:app', host=args.host, port=args.port, workers=args.workers)
@@ -0,0 +1,1418 @@
+import re
+import random
+import string
+import itertools
+import importlib.util
+from collections import deque
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import json
+import io
+import csv
+import os
+import sys
+import hashlib
+import math
+import glob
+from functools import partial, lru_cache
+from threading import local
+from xml.sax.saxutils import escape
+from Testdaten_Metriken import (timed, RECORDS_GENERATED, GENERATOR_SETUP_SECONDS, GENERATION_SECONDS, ADJUSTMENTS,
+                                EXPORT_SECONDS)
+
+# Generator, Exporter und Schemas ohne Abhängigkeit von Streamlit oder FastAPI.
+# pandas, pyarrow, Faker und die Exporter-Bibliotheken werden erst bei der ersten Verwendung importiert,
+# damit die API schnell startet
+
+# Optionale Abhängigkeit für die spaltenorientierten Formate Parquet, Arrow und Feather
+PYARROW_AVAILABLE = importlib.util.find_spec('pyarrow') is not None
+
+# Optionale Abhängigkeit für Schema-Definitionen im YAML-Format
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+# Optionale Abhängigkeit für schnelle JSON-Serialisierung; ohne orjson wird die Standardbibliothek verwendet
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Anzahl Datensätze pro Shard; zugleich die Chunk-Größe beim Streaming
+SHARD_SIZE = 1000
+# Maximale Anzahl paralleler Worker-Prozesse
+MAX_WORKERS = os.cpu_count() or 1
+# Verfügbare Datentypen
+DATA_TYPES = ['registrierung', 'login', 'profil', 'bestellung']
+# Verzeichnis mit deklarativen Schemas für eigene Datentypen
+SCHEMA_DIR = os.environ.get('TESTDATEN_SCHEMA_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'schemas'))
+# Unterstützte Faker-Locales; standardmäßig werden alle geladen
+SUPPORTED_LOCALES = ['de_DE', 'pl_PL', 'de_AT', 'nl_NL', 'de_CH']
+# Exportformate und deren Media-Types
+EXPORT_FORMATS = {
+    'json': 'application/json',
+    'csv': 'text/csv',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'xml': 'application/xml',
+    'ndjson': 'application/x-ndjson'
+}
+# Spaltenorientierte Binärformate (nur mit pyarrow) und deren erlaubte Kompressionen
+COLUMNAR_FORMATS = {
+    'parquet': ('application/vnd.apache.parquet', ['snappy', 'gzip', 'brotli', 'zstd', 'lz4', 'none']),
+    'arrow': ('application/vnd.apache.arrow.stream', ['lz4', 'zstd', 'none']),
+    'feather': ('application/vnd.apache.arrow.file', ['lz4', 'zstd', 'none'])
+}
+if PYARROW_AVAILABLE:
+    EXPORT_FORMATS.update({format: media_type for format, (media_type, _) in COLUMNAR_FORMATS.items()})
+# Anzahl Datensätze pro geschriebenem Chunk beim Streaming-Export
+EXPORT_CHUNK_SIZE = 1000
+# Maximale Zeilenanzahl eines Excel-Arbeitsblatts (inkl. Kopfzeile)
+XLSX_MAX_ROWS = 1048576
+# Anzahl vorab gezogener Faker-Werte je Feld für die Batch-Generierung
+POOL_SIZE = 2000
+# Ziffern am Anfang von Telefonnummern (Landes-/Ortsvorwahl) und Postleitzahlen (Region), die aus dem Pool
+# übernommen werden; alle weiteren Ziffern werden je Datensatz neu gezogen
+PHONE_PREFIX_DIGITS = 4
+POSTCODE_PREFIX_DIGITS = 2
+
+# Eindeutige Werte: Seriennummern werden seedabhängig permutiert und als Suffix fester Länge
+# zur Basis 36 angehängt; dadurch sind höchstens UNIQUE_SPACE eindeutige Werte je Serie möglich
+UNIQUE_SUFFIX_LENGTH = 6
+UNIQUE_ALPHABET = string.digits + string.ascii_lowercase
+UNIQUE_SPACE = len(UNIQUE_ALPHABET) ** UNIQUE_SUFFIX_LENGTH
+# Felder mit Suffix und das Zeichen, vor dessen letztem Vorkommen das Suffix steht ('' oder fehlend: am Ende)
+UNIQUE_FIELDS = {'benutzername': '', 'email': '@'}
+# Mutationsoperatoren, nach denen ein Wert mit wieder eingesetztem Suffix ungültig und eindeutig bleibt
+UNIQUE_OPERATORS = ('verbotene_zeichen', 'verlängern', 'ohne_zeichen')
+# Mutationsoperatoren, die den Typ eines Werts ändern oder ihn leeren; einzelne ungültige Werte
+# (mutate_value) verwenden sie nicht, damit diese wie die gültigen nicht-leere Zeichenketten bleiben
+RETYPE_OPERATORS = ('falscher_typ', 'leer')
+
+# Text-Spalten mit höchstens so vielen verschiedenen Werten werden dictionary-kodiert
+CATEGORY_MAX_VALUES = 1024
+
+# Regeln für Benutzernamen und Passwörter
+USERNAME_MIN_LENGTH = 4
+USERNAME_MAX_LENGTH = 12
+USERNAME_INVALID_CHARS = re.compile(r'[^a-zA-Z0-9ÄÖÜäöü]')
+PASSWORD_MIN_LENGTH = 8
+PASSWORD_MAX_LENGTH = 20
+PASSWORD_SPECIAL_CHARS = '@$!%*?'
+PASSWORD_CHAR_CLASSES = (string.ascii_lowercase, string.ascii_uppercase, string.digits, PASSWORD_SPECIAL_CHARS)
+PASSWORD_ALPHABET = ''.join(PASSWORD_CHAR_CLASSES)
+
+# Ungültige Datensätze der eingebauten Datentypen entstehen aus gültigen, in denen je Zeile genau eine
+# (nach `gewicht` gezogene) Regel verletzt wird; der Name der Regel steht in der Spalte 'verletzte_regel'.
+# `auch` überträgt den mutierten Wert auf weitere Felder (z.B. passwort_wiederholen), damit nur die Regel
+# selbst verletzt ist. Die Operatoren und ihre Parameter stehen in MUTATION_OPERATORS
+MUTATION_RULES = {
+    'registrierung': [
+        {'feld': 'benutzername', 'operator': 'kürzen', 'länge': USERNAME_MIN_LENGTH - 1},
+        {'feld': 'benutzername', 'operator': 'verlängern', 'länge': USERNAME_MAX_LENGTH},
+        {'feld': 'benutzername', 'operator': 'verbotene_zeichen', 'zeichen': '@#!?.-_ '},
+        {'feld': 'benutzername', 'operator': 'leer'},
+        {'feld': 'benutzername', 'operator': 'falscher_typ'},
+        {'feld': 'passwort', 'operator': 'kürzen', 'länge': PASSWORD_MIN_LENGTH - 1, 'auch': ['passwort_wiederholen']},
+        {'feld': 'passwort', 'operator': 'verlängern', 'länge': PASSWORD_MAX_LENGTH, 'auch': ['passwort_wiederholen']},
+        {'feld': 'passwort', 'operator': 'verbotene_zeichen', 'zeichen': '#&^~ äöü', 'auch': ['passwort_wiederholen']},
+        {'feld': 'passwort', 'operator': 'ohne_zeichen', 'zeichen': PASSWORD_SPECIAL_CHARS, 'ersatz': 'x',
+         'name': 'passwort:ohne_sonderzeichen', 'auch': ['passwort_wiederholen']},
+        {'feld': 'passwort', 'operator': 'ohne_zeichen', 'zeichen': string.digits, 'ersatz': 'x',
+         'name': 'passwort:ohne_ziffern', 'auch': ['passwort_wiederholen']},
+        {'feld': 'passwort', 'operator': 'leer', 'auch': ['passwort_wiederholen']},
+        {'feld': 'passwort_wiederholen', 'operator': 'abweichend', 'gewicht': 2},
+        {'feld': 'AGB akzeptieren', 'operator': 'falscher_typ'},
+    ],
+    'login': [
+        {'feld': 'benutzername', 'operator': 'kürzen', 'länge': USERNAME_MIN_LENGTH - 1},
+        {'feld': 'benutzername', 'operator': 'verlängern', 'länge': USERNAME_MAX_LENGTH},
+        {'feld': 'benutzername', 'operator': 'verbotene_zeichen', 'zeichen': '@#!?.-_ '},
+        {'feld': 'benutzername', 'operator': 'leer'},
+        {'feld': 'benutzername', 'operator': 'falscher_typ'},
+        {'feld': 'passwort', 'operator': 'kürzen', 'länge': PASSWORD_MIN_LENGTH - 1},
+        {'feld': 'passwort', 'operator': 'verlängern', 'länge': PASSWORD_MAX_LENGTH},
+        {'feld': 'passwort', 'operator': 'verbotene_zeichen', 'zeichen': '#&^~ äöü'},
+        {'feld': 'passwort', 'operator': 'ohne_zeichen', 'zeichen': PASSWORD_SPECIAL_CHARS, 'ersatz': 'x',
+         'name': 'passwort:ohne_sonderzeichen'},
+        {'feld': 'passwort', 'operator': 'ohne_zeichen', 'zeichen': string.digits, 'ersatz': 'x',
+         'name': 'passwort:ohne_ziffern'},
+        {'feld': 'passwort', 'operator': 'leer'},
+    ],
+    'profil': [
+        {'feld': 'nachname', 'operator': 'leer'},
+        {'feld': 'vorname', 'operator': 'leer'},
+        {'feld': 'vorname', 'operator': 'verbotene_zeichen', 'zeichen': '0123456789@#'},
+        {'feld': 'postleitzahl', 'operator': 'kürzen', 'länge': 2},
+        {'feld': 'postleitzahl', 'operator': 'verbotene_zeichen', 'zeichen': '!?#*'},
+        {'feld': 'telefonnummer', 'operator': 'verbotene_zeichen', 'zeichen': 'abcxyz#'},
+        {'feld': 'alter', 'operator': 'außerhalb_bereich', 'bereich': [18, 99], 'gewicht': 2},
+        {'feld': 'alter', 'operator': 'falscher_typ'},
+        {'feld': 'alter', 'operator': 'leer'},
+        {'feld': 'geschlecht', 'operator': 'unbekannter_wert', 'werte': ['X', 'unbekannt', 'männlich']},
+        {'feld': 'email', 'operator': 'ohne_zeichen', 'zeichen': '@', 'name': 'email:ohne_at', 'gewicht': 2},
+        {'feld': 'email', 'operator': 'verbotene_zeichen', 'zeichen': ' ,;()'},
+        {'feld': 'email', 'operator': 'leer'},
+    ],
+    'bestellung': [
+        {'feld': 'produkt', 'operator': 'unbekannter_wert', 'werte': ['Tee', 'Kakao', 'Smoothie']},
+        {'feld': 'produkt', 'operator': 'leer'},
+        {'feld': 'menge', 'operator': 'außerhalb_bereich', 'bereich': [1, 5], 'gewicht': 2},
+        {'feld': 'menge', 'operator': 'falscher_typ'},
+        {'feld': 'preis', 'operator': 'außerhalb_bereich', 'bereich': [1.0, 50.0], 'gewicht': 2},
+        {'feld': 'preis', 'operator': 'falscher_typ'},
+        {'feld': 'währung', 'operator': 'unbekannter_wert', 'werte': ['USD', 'eur', 'XXX']},
+    ],
+}
+
+
+def dumps_json(data):
+    # Kompaktes JSON als UTF-8-Bytes, mit orjson deutlich schneller als json.dumps
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+# Spaltenorientierter Speicher für generierte Datensätze: typisierte Arrays für Zahlen,
+# dictionary-kodierte Kategorien und deduplizierte Strings statt Listen von Dicts mit wiederholten Schlüsseln
+class RecordStore:
+    def __init__(self, columns):
+        self.columns = {name: self._compact(values) for name, values in columns.items()}
+        self.length = len(next(iter(self.columns.values()))) if self.columns else 0
+
+    @classmethod
+    def from_records(cls, records):
+        records = list(records)
+        names = list(records[0]) if records else []
+        return cls({name: [record[name] for record in records] for name in names})
+
+    @staticmethod
+    def _compact(values):
+        import pandas as pd
+        if isinstance(values, pd.Categorical):
+            return values
+        column = values if isinstance(values, np.ndarray) else pd.Series(values).to_numpy()
+        if column.dtype.kind in 'iu':
+            # Kleinster Ganzzahltyp, der den Wertebereich abdeckt
+            for dtype in (np.int8, np.int16, np.int32, np.int64):
+                info = np.iinfo(dtype)
+                if len(column) == 0 or (info.min <= column.min() and column.max() <= info.max):
+                    return column.astype(dtype, copy=False)
+        if column.dtype.kind in 'fb':
+            return column
+        # Text und gemischte Werte: wenige verschiedene Werte als Kategorie, reiner Text mit pyarrow als
+        # Arrow-String-Array (ein Puffer statt eines Python-Objekts je Wert), sonst dedupliziert
+        codes, uniques = pd.factorize(column, use_na_sentinel=False)
+        # Fehlende Werte (z.B. geleerte Zahlen ungültiger Datensätze) bleiben None und sind keine Kategorie
+        missing = pd.isna(uniques)
+        uniques = np.array([None if is_missing else sys.intern(value) if isinstance(value, str) else value
+                            for value, is_missing in zip(uniques, missing)], dtype=object)
+        if len(uniques) <= CATEGORY_MAX_VALUES and 2 * len(uniques) <= len(column) and not missing.any():
+            return pd.Categorical.from_codes(codes, categories=uniques)
+        if PYARROW_AVAILABLE and all(isinstance(value, str) for value in uniques[~missing]):
+            return pd.array(uniques[codes], dtype='string[pyarrow]')
+        return uniques[codes]
+
+    @staticmethod
+    def _values(column):
+        # Werte eines Spaltenausschnitts als Liste; fehlende Werte in Arrow-String-Arrays werden zu None
+        if isinstance(column, np.ndarray):
+            return column.tolist()
+        return column.to_numpy(dtype=object, na_value=None).tolist()
+
+    def __len__(self):
+        return self.length
+
+    def to_pandas(self):
+        import pandas as pd
+        return pd.DataFrame(self.columns, copy=False)
+
+    def to_arrow(self):
+        import pandas as pd
+        pa = require_pyarrow()
+        arrays = {}
+        for name, column in self.columns.items():
+            if isinstance(column, pd.Categorical):
+                arrays[name] = pa.DictionaryArray.from_arrays(column.codes,
+                                                              arrow_column(pa, column.categories.to_numpy()))
+            elif not isinstance(column, np.ndarray):
+                # Arrow-String-Array: gleicher Typ wie bei generate_batch(..., as_arrow=True)
+                arrays[name] = pa.array(column, type=pa.string())
+            else:
+                arrays[name] = arrow_column(pa, column)
+        return pa.table(arrays)
+
+    def iter_records(self, chunk_size=EXPORT_CHUNK_SIZE):
+        # Liefert die Datensätze als Dicts, ohne alle gleichzeitig zu erzeugen (z.B. für iter_export)
+        names = list(self.columns)
+        for start in range(0, self.length, chunk_size):
+            stop = min(start + chunk_size, self.length)
+            values = [self._values(column[start:stop]) for column in self.columns.values()]
+            for row in zip(*values):
+                yield dict(zip(names, row))
+
+    def memory_usage(self):
+        # Bytes der Arrays plus der einmalig gespeicherten Strings
+        import pandas as pd
+        total = 0
+        for column in self.columns.values():
+            if isinstance(column, pd.Categorical):
+                total += column.codes.nbytes + sum(sys.getsizeof(value) for value in column.categories)
+            elif not isinstance(column, np.ndarray):
+                total += column.nbytes
+            else:
+                total += column.nbytes
+                if column.dtype == object:
+                    total += sum(sys.getsizeof(value) for value in {id(value): value for value in column}.values())
+        return total
+
+
+def scaled_pool_size(n):
+    # Pool für Faker-Felder, die sich nicht aus Teilen bilden lassen: wächst mit der Wurzel von n über
+    # POOL_SIZE hinaus, damit große Batches nicht auf eine feste Anzahl verschiedener Werte beschränkt sind
+    return min(n, max(POOL_SIZE, int(math.sqrt(n * POOL_SIZE))))
+
+
+# Klasse zur Generierung von Testdaten
+class TestDataGenerator:
+    def __init__(self, seed=None, locales=None):
+        from faker import Faker
+        self.locales = list(locales or SUPPORTED_LOCALES)
+        self.fake = Faker(self.locales)
+        self.genders = ['Männlich', 'Weiblich', 'Divers', 'Keine Angabe']
+        self.products = ['Kaffee', 'Espresso', 'Latte', 'Cappuccino', 'Mokka']
+        self.random = random.Random()
+        # Kompilierte Schema-Erzeuger (siehe RecordSchema.compiled); sie binden self.random und self.fake,
+        # die reseed nur neu seedet, und bleiben daher über reseed hinweg gültig
+        self._compiled = {}
+        # Zahlen, die an E-Mail-Adressen angehängt werden (Index 0: keine Zahl); erst bei Bedarf erzeugt
+        self._email_numbers = None
+        self.reseed(seed)
+
+    def reseed(self, seed=None):
+        # Setzt alle Zufallsquellen (Faker, random, NumPy) auf einen gemeinsamen Seed zurück
+        # Ohne Seed wird Faker frisch aus dem Betriebssystem geseedet, damit ein wiederverwendeter
+        # Generator nicht die Folge einer vorherigen Anfrage mit Seed fortsetzt
+        self.fake.seed_instance(seed)
+        self.random.seed(seed)
+        self.rng = np.random.default_rng(seed)
+        # Pools hängen vom Zustand bei ihrer Erzeugung ab und werden daher neu gezogen
+        self._pools = {}
+        # Eindeutige Werte: nächste Seriennummer und die Permutation (Multiplikator teilerfremd zu
+        # UNIQUE_SPACE), abgeleitet aus einem eigenen Zweig des Seeds, damit self.rng unverändert bleibt
+        self.unique_serial = 0
+        multiplier, offset = (int(value) for value in
+                              np.random.SeedSequence(seed, spawn_key=(1,)).generate_state(2, dtype=np.uint64))
+        self._unique_permutation = (multiplier % (UNIQUE_SPACE // 6) * 6 + 1, offset % UNIQUE_SPACE)
+
+    def generate_username(self, valid=True):
+        if valid:
+            # Gültig per Konstruktion: unerlaubte Zeichen entfernen, auf die Maximallänge kürzen
+            # und zu kurze Namen mit Ziffern auffüllen (kein Verwerfen und Neuversuchen)
+            # Die Anpassungen werden gezählt, da ihre Häufigkeit von den Faker-Providern abhängt
+            username = USERNAME_INVALID_CHARS.sub('', self.fake.user_name())
+            if len(username) > USERNAME_MAX_LENGTH:
+                ADJUSTMENTS.inc(feld='benutzername', art='gekuerzt')
+                username = username[:USERNAME_MAX_LENGTH]
+            elif len(username) < USERNAME_MIN_LENGTH:
+                ADJUSTMENTS.inc(feld='benutzername', art='aufgefuellt')
+                username += ''.join(self.random.choices(string.digits, k=USERNAME_MIN_LENGTH - len(username)))
+            return username
+        else:
+            return self.mutate_value('login', 'benutzername', self.generate_username(True))
+
+    def generate_password(self, valid=True):
+        if valid:
+            # Gültig per Konstruktion: Länge wählen, je ein Zeichen jeder Kategorie setzen,
+            # mit erlaubten Zeichen auffüllen und mischen
+            length = self.random.randint(PASSWORD_MIN_LENGTH, PASSWORD_MAX_LENGTH)
+            chars = [self.random.choice(char_class) for char_class in PASSWORD_CHAR_CLASSES]
+            chars += self.random.choices(PASSWORD_ALPHABET, k=length - len(chars))
+            self.random.shuffle(chars)
+            return ''.join(chars)
+        else:
+            return self.mutate_value('login', 'passwort', self.generate_password(True))
+
+    def generate_email(self):
+        return self.fake.email()
+
+    def generate_bestellung(self):
+        quantity = self.random.randint(1, 5)
+        price = round(self.random.uniform(1.0, 10.0) * quantity, 2)
+        return {'produkt': self.random.choice(self.products), 'menge': quantity, 'preis': price, 'währung': 'EUR'}
+
+
+
+    def generate_registration(self, valid=True):
+        password = self.generate_password(valid)
+        return {'benutzername': self.generate_username(valid), 'passwort': password, 'passwort_wiederholen': password, 'AGB akzeptieren': self.fake.boolean()}
+
+    def generate_login(self, valid=True):
+        return {'benutzername': self.generate_username(valid), 'passwort': self.generate_password(valid)}
+
+    def generate_profile(self):
+        gender = self.random.choice(self.genders)
+        return {
+            'nachname': self.fake.last_name(),
+            'vorname': self.fake.first_name(),
+            'straße': self.fake.street_name(),
+            'stadt': self.fake.city(),
+            'postleitzahl': self.fake.postcode(),
+            'land': self.fake.country(),
+            'telefonnummer': self.fake.phone_number(),
+            'alter': self.random.randint(18, 99),
+            'geschlecht': gender,
+            'email': self.fake.email()
+        }
+
+    # Batch-Generierung: ganze Spalten auf einmal statt einzelner Faker-Aufrufe pro Datensatz
+    def _pool(self, field, factory, n=POOL_SIZE, size=None):
+        # Faker-Werte werden vorab gezogen und danach nur noch per Index gesampelt. Der Pool umfasst
+        # min(POOL_SIZE, n) (oder size) Werte und wächst erst mit größeren Anfragen, damit kleine Anfragen
+        # nach einem reseed nicht POOL_SIZE Faker-Aufrufe je Feld kosten
+        size = max(1, min(POOL_SIZE, n) if size is None else size)
+        pool = self._pools.get(field)
+        if pool is None or len(pool) < size:
+            start = 0 if pool is None else len(pool)
+            added = np.array([factory() for _ in range(size - start)], dtype=object)
+            pool = self._pools[field] = added if pool is None else np.concatenate([pool, added])
+        return pool
+
+    def _sample(self, field, factory, n, size=None):
+        pool = self._pool(field, factory, n, size)
+        return pool[self._pool_index(len(pool), n)]
+
+    def _pool_index(self, size, n):
+        # Solange der Pool reicht, ohne Zurücklegen: ein Batch enthält dann so viele verschiedene Werte wie
+        # die Einzel-Generierung; erst größere Batches wiederholen Pool-Werte
+        if n <= size:
+            return self.rng.choice(size, n, replace=False)
+        return self.rng.integers(0, size, n)
+
+    def _sample_digits(self, field, factory, n, keep):
+        # Wie _sample, ersetzt aber in jedem Wert alle Ziffern nach den ersten `keep` durch zufällige Ziffern
+        # (auf einer Zeichenmatrix); Format, Trennzeichen und Vorwahl bleiben erhalten, die Anzahl
+        # verschiedener Werte ist aber nicht mehr durch den Pool begrenzt
+        pool = self._pool(field, factory, n)
+        pool_chars = self._pools.get(f'{field}.zeichen')
+        if pool_chars is None or len(pool_chars) != len(pool):
+            pool_chars = self._pools[f'{field}.zeichen'] = pool.astype(str)
+        chars = pool_chars[self._pool_index(len(pool), n)]
+        codes = chars.view(np.uint32).reshape(len(chars), chars.dtype.itemsize // 4)
+        digits = codes - ord('0') < 10
+        replace = np.cumsum(digits, axis=1, dtype=np.uint8) > keep
+        replace &= digits
+        codes[replace] = ord('0') + self.rng.integers(0, 10, int(replace.sum()), dtype=np.uint32)
+        return chars.astype(object)
+
+    def _email_column(self, n, suffixes=None):
+        # E-Mail-Adressen aus Teilen wie bei fake.email(): Benutzername aus einem Pool, meist mit
+        # angehängter Zahl, und eine Domain; mit suffixes steht das Suffix direkt vor dem '@'
+        if self._email_numbers is None:
+            self._email_numbers = np.array([''] + [str(number) for number in range(1, 10000)], dtype=object)
+        numbers = self.rng.integers(1, len(self._email_numbers), n)
+        numbers[self.rng.random(n) < 0.1] = 0
+        local = self._sample('email.name', self.fake.user_name, n) + self._email_numbers[numbers]
+        if suffixes is not None:
+            local = local + suffixes
+        return local + self._sample('email.domain', lambda: '@' + self.fake.safe_domain_name(), n, size=20)
+
+    def _choice(self, values, n):
+        return np.array(values, dtype=object)[self.rng.integers(0, len(values), n)]
+
+    def _password_column(self, n):
+        # Vektorisierte Variante von generate_password(valid=True) auf einer Zeichenmatrix
+        alphabet = np.frombuffer(PASSWORD_ALPHABET.encode('ascii'), dtype=np.uint8)
+        lengths = self.rng.integers(PASSWORD_MIN_LENGTH, PASSWORD_MAX_LENGTH + 1, n)
+        chars = alphabet[self.rng.integers(0, len(alphabet), (n, PASSWORD_MAX_LENGTH))]
+        # Die ersten Positionen garantieren je ein Zeichen jeder Kategorie
+        for position, char_class in enumerate(PASSWORD_CHAR_CLASSES):
+            class_chars = np.frombuffer(char_class.encode('ascii'), dtype=np.uint8)
+            chars[:, position] = class_chars[self.rng.integers(0, len(class_chars), n)]
+        # Zeilenweise Permutation der ersten `length` Positionen, der Rest wandert ans Ende
+        positions = np.arange(PASSWORD_MAX_LENGTH)
+        keys = self.rng.random((n, PASSWORD_MAX_LENGTH))
+        keys[positions >= lengths[:, None]] = np.inf
+        chars = np.take_along_axis(chars, np.argsort(keys, axis=1), axis=1)
+        chars[positions >= lengths[:, None]] = 0
+        return chars.view(f'S{PASSWORD_MAX_LENGTH}').ravel().astype(str).astype(object)
+
+    def _unique_suffixes(self, n, start=None):
+        # Suffixe für die Seriennummern start..start+n-1; verschiedene Nummern ergeben verschiedene Suffixe.
+        # Ohne start wird die Serie des Generators fortgesetzt, sodass auch aufeinanderfolgende Batches
+        # eindeutig bleiben. Es wird nichts über bereits vergebene Werte gespeichert
+        start = self.unique_serial if start is None else start
+        if start < 0 or start + n > UNIQUE_SPACE:
+            raise ValueError(f'Es sind höchstens {UNIQUE_SPACE} eindeutige Werte je Serie möglich')
+        self.unique_serial = start + n
+        multiplier, offset = self._unique_permutation
+        values = (np.arange(start, start + n, dtype=np.uint64) * np.uint64(multiplier) + np.uint64(offset)) \
+            % np.uint64(UNIQUE_SPACE)
+        alphabet = np.frombuffer(UNIQUE_ALPHABET.encode('ascii'), dtype=np.uint8)
+        digits = np.empty((n, UNIQUE_SUFFIX_LENGTH), dtype=np.uint8)
+        for position in range(UNIQUE_SUFFIX_LENGTH - 1, -1, -1):
+            digits[:, position] = alphabet[values % np.uint64(len(alphabet))]
+            values //= np.uint64(len(alphabet))
+        return digits.view(f'S{UNIQUE_SUFFIX_LENGTH}').ravel().astype(str).astype(object)
+
+    def _sample_unique(self, field, factory, split, suffixes):
+        # Wie _sample, aber mit eingefügtem Suffix: split teilt einen Pool-Wert in Anfang und Ende,
+        # das Suffix steht an fester Position vor dem Ende und macht die Werte eindeutig
+        pool = self._pool(field, factory, len(suffixes))
+        parts = self._pools.get(f'{field}.teile', (np.empty(0, dtype=object), np.empty(0, dtype=object)))
+        if len(parts[0]) < len(pool):
+            # Nur die seit dem letzten Aufruf hinzugekommenen Pool-Werte werden geteilt
+            heads, tails = zip(*(split(value) for value in pool[len(parts[0]):]))
+            parts = self._pools[f'{field}.teile'] = (np.concatenate([parts[0], np.array(heads, dtype=object)]),
+                                                    np.concatenate([parts[1], np.array(tails, dtype=object)]))
+        index = self._pool_index(len(parts[0]), len(suffixes))
+        return parts[0][index] + suffixes + parts[1][index]
+
+    def _account_columns(self, n, suffixes=None):
+        if suffixes is None:
+            usernames = self._sample('benutzername', lambda: self.generate_username(True), n)
+        else:
+            # Gekürzt, damit der Name mit Suffix die Maximallänge einhält
+            usernames = self._sample_unique('benutzername', lambda: self.generate_username(True),
+                                            lambda value: (value[:USERNAME_MAX_LENGTH - UNIQUE_SUFFIX_LENGTH], ''),
+                                            suffixes)
+        return usernames, self._password_column(n)
+
+    def mutate_columns(self, data_type, columns, rules=None, suffixes=None):
+        # Verletzt in jeder Zeile genau eine nach Gewicht gezogene Regel (Standard: MUTATION_RULES) und
+        # ergänzt die Spalte 'verletzte_regel'. Die Operatoren arbeiten je Regel auf allen betroffenen
+        # Zeilen auf einmal; Spalten, die Werte eines anderen Typs erhalten, werden zu object-Arrays.
+        # Mit suffixes (unique=True) wird das Suffix der UNIQUE_FIELDS vor der Mutation entfernt und danach
+        # wieder eingesetzt, sodass die Werte eindeutig bleiben
+        rules = MUTATION_RULES[data_type] if rules is None else rules
+        check_mutation_rules(rules, columns)
+        if suffixes is not None:
+            for rule in rules:
+                if rule['feld'] in UNIQUE_FIELDS and rule['operator'] not in UNIQUE_OPERATORS:
+                    raise ValueError(f'Mutationsregel {rule_name(rule, rule["operator"])} liefert mit unique=True '
+                                     f'keine eindeutigen Werte')
+        n = len(next(iter(columns.values())))
+        weights = np.array([rule.get('gewicht', 1) for rule in rules], dtype=float)
+        rule_index = self.rng.choice(len(rules), n, p=weights / weights.sum())
+        mutated = dict(columns)
+        violated = np.empty(n, dtype=object)
+        for index, rule in enumerate(rules):
+            rows = np.flatnonzero(rule_index == index)
+            if not len(rows):
+                continue
+            function = MUTATION_OPERATORS[rule['operator']][0]
+            # Immer aus den gültigen Werten, auch wenn eine andere Regel die Spalte schon umgewandelt hat
+            values = np.asarray(columns[rule['feld']])[rows]
+            anchor = UNIQUE_FIELDS.get(rule['feld']) if suffixes is not None else None
+            if anchor is None:
+                values = function(self.rng, values, rule)
+            else:
+                values = function(self.rng, np.array([_strip_suffix(value, anchor) for value in values], dtype=object),
+                                  rule)
+                values = np.array([_insert_suffix(value, suffix, anchor)
+                                   for value, suffix in zip(values, suffixes[rows])], dtype=object)
+            for field in [rule['feld'], *rule.get('auch', [])]:
+                column = mutated[field]
+                if column is columns[field]:
+                    column = np.array(column, copy=True)
+                if column.dtype != object and values.dtype != column.dtype:
+                    column = column.astype(object)
+                column[rows] = values
+                mutated[field] = column
+            violated[rows] = rule_name(rule, rule['operator'])
+        mutated['verletzte_regel'] = violated
+        return mutated
+
+    def mutate_records(self, data_type, records, rules=None):
+        # Wie mutate_columns für eine Liste von Datensätzen (API und Streaming)
+        if not records:
+            return []
+        columns = {}
+        for name in records[0]:
+            column = np.array([record[name] for record in records])
+            columns[name] = column.astype(object) if column.dtype.kind in 'US' else column
+        columns = self.mutate_columns(data_type, columns, rules)
+        names = list(columns)
+        return [dict(zip(names, row)) for row in zip(*(column.tolist() for column in columns.values()))]
+
+    def mutate_value(self, data_type, field, value):
+        # Einzelner ungültiger Wert nach einer der Regeln für dieses Feld, die seinen Typ beibehalten
+        rules = [rule for rule in MUTATION_RULES[data_type]
+                 if rule['feld'] == field and rule['operator'] not in RETYPE_OPERATORS]
+        return self.mutate_columns(data_type, {field: np.array([value], dtype=object)},
+                                   [{key: item for key, item in rule.items() if key != 'auch'} for rule in rules])[field][0]
+
+    def generate_batch(self, data_type, n, valid=True, as_arrow=False, as_store=False, unique=False,
+                       unique_start=None):
+        # Liefert n Datensätze als DataFrame mit denselben Spalten wie die Einzel-Generatoren;
+        # mit as_arrow=True direkt als Arrow-Tabelle ohne Umweg über pandas,
+        # mit as_store=True als speichersparender RecordStore.
+        # unique=True macht Benutzernamen und E-Mail-Adressen eindeutig, auch über alle Batches eines
+        # Generators seit dem letzten reseed; unique_start setzt die Serie an einer Seriennummer fort
+        return self._to_table(self._batch_columns(data_type, n, valid, unique, unique_start), as_arrow, as_store)
+
+    def _to_table(self, columns, as_arrow=False, as_store=False):
+        if as_store:
+            return RecordStore(columns)
+        if as_arrow:
+            return arrow_table(columns)
+        import pandas as pd
+        return pd.DataFrame(columns)
+
+    def _batch_columns(self, data_type, n, valid=True, unique=False, unique_start=None):
+        suffixes = None
+        if unique and data_type in ('registrierung', 'login', 'profil'):
+            suffixes = self._unique_suffixes(n, unique_start)
+        if data_type == 'bestellung':
+            quantity = self.rng.integers(1, 6, n)
+            columns = {
+                'produkt': self._choice(self.products, n),
+                'menge': quantity,
+                'preis': np.round(self.rng.uniform(1.0, 10.0, n) * quantity, 2),
+                'währung': np.full(n, 'EUR', dtype=object)
+            }
+        elif data_type == 'registrierung':
+            usernames, passwords = self._account_columns(n, suffixes)
+            columns = {
+                'benutzername': usernames,
+                'passwort': passwords,
+                'passwort_wiederholen': passwords.copy(),
+                'AGB akzeptieren': self.rng.random(n) < 0.5
+            }
+        elif data_type == 'login':
+            usernames, passwords = self._account_columns(n, suffixes)
+            columns = {'benutzername': usernames, 'passwort': passwords}
+        elif data_type == 'profil':
+            columns = {
+                'nachname': self._sample('nachname', self.fake.last_name, n),
+                'vorname': self._sample('vorname', self.fake.first_name, n),
+                'straße': self._sample('straße', self.fake.street_name, n, scaled_pool_size(n)),
+                'stadt': self._sample('stadt', self.fake.city, n),
+                'postleitzahl': self._sample_digits('postleitzahl', self.fake.postcode, n, POSTCODE_PREFIX_DIGITS),
+                'land': self._sample('land', self.fake.country, n),
+                'telefonnummer': self._sample_digits('telefonnummer', self.fake.phone_number, n, PHONE_PREFIX_DIGITS),
+                'alter': self.rng.integers(18, 100, n),
+                'geschlecht': self._choice(self.genders, n),
+                # Eindeutig: Suffix direkt vor dem letzten '@', die Domain enthält kein weiteres '@'
+                'email': self._email_column(n, suffixes)
+            }
+        elif data_type in schemas:
+            return schemas[data_type].batch_columns(self, n, valid)
+        else:
+            raise ValueError('Ungültiger Datentyp')
+        # Ungültige Datensätze: gültige Spalten, in denen je Zeile eine Regel verletzt wird
+        if valid:
+            return columns
+        if suffixes is None:
+            return self.mutate_columns(data_type, columns)
+        # Eindeutig: nur Regeln, nach denen Benutzernamen und E-Mail-Adressen mit Suffix eindeutig bleiben
+        rules = [rule for rule in MUTATION_RULES[data_type]
+                 if rule['feld'] not in UNIQUE_FIELDS or rule['operator'] in UNIQUE_OPERATORS]
+        return self.mutate_columns(data_type, columns, rules, suffixes)
+
+    # Relationale Datensätze: Fremdschlüssel sind reine NumPy-Arrays, es gibt keine Suche pro Datensatz
+    def _skewed_ids(self, num_keys, n, zipf_exponent):
+        # Zieht n Schlüssel aus 0..num_keys-1; bei zipf_exponent > 0 Zipf-verteilt über eine
+        # kumulierte Verteilung (ein Array der Länge num_keys), sonst gleichverteilt
+        if zipf_exponent == 0:
+            return self.rng.integers(0, num_keys, n)
+        cdf = np.cumsum(1.0 / np.arange(1, num_keys + 1) ** zipf_exponent)
+        cdf /= cdf[-1]
+        ranks = np.searchsorted(cdf, self.rng.random(n), side='right')
+        # Ränge zufällig auf die Schlüssel verteilen, damit die häufigsten Kunden nicht immer die kleinsten IDs haben
+        return self.rng.permutation(num_keys)[ranks]
+
+    def generate_relational(self, num_profiles, num_orders, zipf_exponent=1.1, as_arrow=False, as_store=False,
+                            unique=False):
+        # Profile, je Profil eine Registrierung und Bestellungen, die per profil_id auf Profile verweisen;
+        # unique=True macht E-Mail-Adressen der Profile und Benutzernamen der Registrierungen eindeutig
+        id_dtype = np.int32 if max(num_profiles, num_orders) < 2 ** 31 else np.int64
+        profile_ids = np.arange(1, num_profiles + 1, dtype=id_dtype)
+        profiles = {'profil_id': profile_ids, **self._batch_columns('profil', num_profiles, unique=unique)}
+        registrations = {'profil_id': profile_ids, **self._batch_columns('registrierung', num_profiles, unique=unique)}
+        customers = self._skewed_ids(num_profiles, num_orders, zipf_exponent)
+        # Index Kunde -> Bestellungen (CSR): Anzahl der Bestellungen je Profil und laufende Nummer jeder
+        # Bestellung beim Kunden in O(M), ohne Suche pro Datensatz
+        offsets, positions = build_index(customers, num_profiles)
+        counts = np.diff(offsets)
+        customer_order_number = np.empty(num_orders, dtype=id_dtype)
+        customer_order_number[positions] = np.arange(1, num_orders + 1) - np.repeat(offsets[:-1], counts)
+        profiles['anzahl_bestellungen'] = counts.astype(id_dtype)
+        orders = {
+            'bestellung_id': np.arange(1, num_orders + 1, dtype=id_dtype),
+            'profil_id': profile_ids[customers],
+            'kundenbestellung_nr': customer_order_number,
+            **self._batch_columns('bestellung', num_orders)
+        }
+        return {
+            'profile': self._to_table(profiles, as_arrow, as_store),
+            'registrierungen': self._to_table(registrations, as_arrow, as_store),
+            'bestellungen': self._to_table(orders, as_arrow, as_store)
+        }
+
+    def record_factories(self, data_type):
+        # Liefert die Erzeuger für gültige und ungültige Datensätze eines Datentyps; ungültige Datensätze
+        # der eingebauten Datentypen sind per mutate_records mutierte gültige
+        if data_type == 'bestellung':
+            valid_factory = self.generate_bestellung
+        elif data_type == 'registrierung':
+            valid_factory = partial(self.generate_registration, valid=True)
+        elif data_type == 'login':
+            valid_factory = partial(self.generate_login, valid=True)
+        elif data_type == 'profil':
+            valid_factory = self.generate_profile
+        elif data_type in schemas:
+            return schemas[data_type].record_factories(self)
+        else:
+            raise ValueError('Ungültiger Datentyp')
+        return valid_factory, lambda: self.mutate_records(data_type, [valid_factory()])[0]
+
+    def generate_list(self, data_type, n, valid=True):
+        # n Datensätze als Liste von Dicts; ungültige Datensätze der eingebauten Datentypen werden
+        # gebündelt mutiert statt einzeln über record_factories
+        if valid or data_type not in MUTATION_RULES:
+            factory = self.record_factories(data_type)[0 if valid else 1]
+            return [factory() for _ in range(n)]
+        factory = self.record_factories(data_type)[0]
+        return self.mutate_records(data_type, [factory() for _ in range(n)])
+
+    def export_data(self, df, format, compression=None, row_group_size=None, compact=False):
+        # df kann für Parquet/Arrow/Feather auch direkt eine Arrow-Tabelle sein;
+        # compact=True liefert JSON ohne Einrückung und ohne Escaping von Umlauten
+        with timed(EXPORT_SECONDS, 'export', format=format):
+            return self._export_data(df, format, compression, row_group_size, compact)
+
+    def _export_data(self, df, format, compression, row_group_size, compact):
+        if format in COLUMNAR_FORMATS:
+            pa = require_pyarrow()
+            if isinstance(df, pa.Table):
+                table = df
+            else:
+                try:
+                    table = pa.Table.from_pandas(df, preserve_index=False)
+                except (pa.ArrowInvalid, pa.ArrowTypeError):
+                    table = arrow_table({name: df[name].tolist() for name in df.columns})
+            sink = pa.BufferOutputStream()
+            self._write_columnar([table], format, sink, compression, row_group_size)
+            return sink.getvalue().to_pybytes()
+        elif format == 'ndjson':
+            return b''.join(self.iter_export(df.to_dict(orient='records'), format))
+        elif format == 'json' and compact:
+            return df.to_json(orient='records', force_ascii=False).encode('utf-8')
+        elif format == 'json':
+            return df.to_json(orient='records', indent=4).encode('utf-8')
+        elif format == 'csv':
+            return df.to_csv(index=False).encode('utf-8')
+        elif format == 'xlsx':
+            import pandas as pd
+            output = io.BytesIO()
+            with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
+                df.to_excel(writer, index=False, sheet_name='Daten')
+            return output.getvalue()
+        elif format == 'xml':
+            import dicttoxml
+            xml_data = dicttoxml.dicttoxml(df.to_dict(orient='records'), custom_root='daten', attr_type=False)
+            return xml_data
+        else:
+            raise ValueError('Ungültiges Exportformat')
+
+    # Streaming-Export: Datensätze werden aus einem Iterator gelesen und chunkweise geschrieben,
+    # sodass nie der gesamte Datenbestand oder die gesamte Ausgabe im Speicher liegt
+    def iter_export(self, records, format, chunk_size=EXPORT_CHUNK_SIZE):
+        buffer = io.StringIO()
+        csv_writer = None
+
+        def write_csv(record, index):
+            nonlocal csv_writer
+            if csv_writer is None:
+                csv_writer = csv.DictWriter(buffer, fieldnames=list(record))
+                csv_writer.writeheader()
+            csv_writer.writerow(record)
+
+        def write_ndjson(record, index):
+            buffer.write(dumps_json(record).decode('utf-8'))
+            buffer.write('\n')
+
+        def write_json(record, index):
+            buffer.write(',\n' if index else '\n')
+            buffer.write(dumps_json(record).decode('utf-8'))
+
+        def write_xml(record, index):
+            # Gleiche Struktur wie dicttoxml in export_data: <daten><item><feld>wert</feld>...</item></daten>
+            buffer.write('<item>')
+            for key, value in record.items():
+                tag = key.replace(' ', '_')
+                if isinstance(value, bool):
+                    value = str(value).lower()
+                # Anführungszeichen wie bei dicttoxml als Entitäten
+                value = escape("" if value is None else str(value), {"'": '&apos;', '"': '&quot;'})
+                buffer.write(f'<{tag}>{value}</{tag}>')
+            buffer.write('</item>')
+
+        writers = {'csv': write_csv, 'ndjson': write_ndjson, 'json': write_json, 'xml': write_xml}
+        if format not in writers:
+            raise ValueError('Ungültiges Exportformat')
+        write_record = writers[format]
+
+        if format == 'json':
+            buffer.write('[')
+        elif format == 'xml':
+            buffer.write('<?xml version="1.0" encoding="UTF-8" ?><daten>')
+
+        count = 0
+        for count, record in enumerate(records, start=1):
+            write_record(record, count - 1)
+            if count % chunk_size == 0:
+                yield buffer.getvalue().encode('utf-8')
+                buffer.seek(0)
+                buffer.truncate()
+
+        if format == 'json':
+            buffer.write('\n]' if count else ']')
+        elif format == 'xml':
+            buffer.write('</daten>')
+        if buffer.tell():
+            yield buffer.getvalue().encode('utf-8')
+
+    def export_stream(self, records, format, target, chunk_size=EXPORT_CHUNK_SIZE, compression=None,
+                      row_group_size=None, string_columns=()):
+        # Schreibt in eine Datei oder ein file-artiges Objekt (z.B. Socket); xlsx im constant_memory-Modus,
+        # Parquet/Arrow/Feather als eine Row-Group bzw. ein Record-Batch pro Chunk; string_columns werden
+        # dort immer als Text geschrieben (siehe string_columns())
+        if format == 'xlsx':
+            self._write_xlsx(records, target)
+        elif format in COLUMNAR_FORMATS:
+            require_pyarrow()
+            records = iter(records)
+            chunk_size = row_group_size or chunk_size
+            chunks = iter(lambda: list(itertools.islice(records, chunk_size)), [])
+            tables = (arrow_table({name: [record.get(name) for record in chunk] for name in chunk[0]}, string_columns)
+                      for chunk in chunks)
+            self._write_columnar(tables, format, target, compression, row_group_size)
+        else:
+            for chunk in self.iter_export(records, format, chunk_size):
+                target.write(chunk)
+
+    def _write_columnar(self, tables, format, target, compression=None, row_group_size=None):
+        # Schreibt eine Folge von Arrow-Tabellen mit gleichem Schema inkrementell in das Zielformat
+        pa = require_pyarrow()
+        import pyarrow.parquet as pq
+        check_compression(format, compression)
+        if compression == 'none':
+            compression = None if format != 'parquet' else 'none'
+        writer = None
+        try:
+            for table in tables:
+                if writer is None:
+                    schema = table.schema
+                    if format == 'parquet':
+                        writer = pq.ParquetWriter(target, table.schema, compression=compression or 'snappy')
+                    else:
+                        options = pa.ipc.IpcWriteOptions(compression=compression)
+                        new_writer = pa.ipc.new_stream if format == 'arrow' else pa.ipc.new_file
+                        writer = new_writer(target, table.schema, options=options)
+                elif table.schema != schema:
+                    # Spätere Chunks können abweichende Typen haben (z.B. gemischte Spalten ungültiger Daten)
+                    try:
+                        table = table.cast(schema)
+                    except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as error:
+                        raise ValueError(f'Spaltentypen weichen vom ersten Chunk ab ({format}): {error}') from error
+                if format == 'parquet':
+                    writer.write_table(table, row_group_size=row_group_size)
+                else:
+                    writer.write_table(table, max_chunksize=row_group_size)
+        finally:
+            if writer is not None:
+                writer.close()
+
+    def _write_xlsx(self, records, target):
+        import xlsxwriter
+        workbook = xlsxwriter.Workbook(target, {'constant_memory': True})
+        worksheet = workbook.add_worksheet('Daten')
+        header = None
+        try:
+            for row, record in enumerate(records, start=1):
+                if row >= XLSX_MAX_ROWS:
+                    raise ValueError('Zu viele Datensätze für das xlsx-Format')
+                if header is None:
+                    header = list(record)
+                    worksheet.write_row(0, 0, header)
+                worksheet.write_row(row, 0, [record[key] for key in header])
+        finally:
+            workbook.close()
+
+def require_pyarrow():
+    # Importiert pyarrow erst bei Bedarf und liefert das Modul
+    if not PYARROW_AVAILABLE:
+        raise ValueError('Für Parquet/Arrow/Feather wird pyarrow benötigt')
+    import pyarrow
+    return pyarrow
+
+
+def check_compression(format, compression):
+    if compression is not None and compression not in COLUMNAR_FORMATS[format][1]:
+        raise ValueError(f'Ungültige Kompression für {format}: {compression}')
+
+
+def arrow_column(pa, values, as_string=False):
+    # Spalten mit gemischten Typen (z.B. ungültige Datensätze mit falschem Typ) werden als Text gespeichert
+    if not as_string:
+        try:
+            return pa.array(values)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            pass
+    return pa.array([None if value is None else str(value) for value in values], pa.string())
+
+
+def arrow_table(columns, string_columns=()):
+    pa = require_pyarrow()
+    return pa.table({name: arrow_column(pa, values, name in string_columns) for name, values in columns.items()})
+
+
+def string_columns(data_type):
+    # Spalten, die in ungültigen Datensätzen einen anderen Typ haben oder fehlen können, sowie verletzte_regel;
+    # beim chunkweisen Schreiben von Parquet/Arrow/Feather sind sie in jedem Chunk Text, damit das Schema
+    # nicht davon abhängt, welche Regeln im ersten Chunk vorkommen
+    if data_type in schemas:
+        return {'verletzte_regel'} | schemas[data_type].retyped_fields()
+    return {'verletzte_regel'} | {rule['feld'] for rule in MUTATION_RULES.get(data_type, [])
+                                  if rule['operator'] in RETYPE_OPERATORS}
+
+
+# Mutationsoperatoren für ungültige Daten: jeder erhält die betroffenen Werte einer Spalte als Array,
+# die Zufallsquelle und die Regel und liefert gleich viele verletzte Werte
+def _as_strings(values):
+    return [str(value) for value in values]
+
+
+def _mutate_truncate(rng, values, rule):
+    # Kürzer als erlaubt: 1 bis `länge` Zeichen
+    lengths = rng.integers(1, rule['länge'] + 1, len(values))
+    return np.array([value[:length] for value, length in zip(_as_strings(values), lengths)], dtype=object)
+
+
+def _mutate_extend(rng, values, rule):
+    # Länger als erlaubt: mit zufälligen Buchstaben und Ziffern über `länge` hinaus auffüllen
+    alphabet = np.frombuffer((string.ascii_letters + string.digits).encode('ascii'), dtype=np.uint8)
+    width = rule['länge'] + 8
+    filler = alphabet[rng.integers(0, len(alphabet), (len(values), width))].view(f'S{width}').ravel().astype(str)
+    extra = rng.integers(1, 8, len(values))
+    return np.array([value + fill[:max(0, rule['länge'] - len(value)) + more]
+                     for value, fill, more in zip(_as_strings(values), filler, extra)], dtype=object)
+
+
+def _mutate_forbidden_chars(rng, values, rule):
+    # Ein verbotenes Zeichen an zufälliger Position einfügen
+    chars = np.array(list(rule['zeichen']), dtype=object)[rng.integers(0, len(rule['zeichen']), len(values))]
+    positions = rng.random(len(values))
+    result = []
+    for value, char, position in zip(_as_strings(values), chars, positions):
+        index = int(position * (len(value) + 1))
+        result.append(value[:index] + char + value[index:])
+    return np.array(result, dtype=object)
+
+
+def _mutate_without_chars(rng, values, rule):
+    # Alle Zeichen aus `zeichen` durch `ersatz` ersetzen (z.B. keine Sonderzeichen mehr im Passwort)
+    table = str.maketrans({char: rule.get('ersatz', '') for char in rule['zeichen']})
+    return np.array([value.translate(table) for value in _as_strings(values)], dtype=object)
+
+
+def _mutate_empty(rng, values, rule):
+    # Leerer Text bzw. fehlender Wert bei Zahlen und Wahrheitswerten
+    return np.full(len(values), '' if values.dtype == object else None, dtype=object)
+
+
+def _mutate_out_of_range(rng, values, rule):
+    # Zufällig unter- oder oberhalb des gültigen Bereichs [min, max]
+    low, high = rule['bereich']
+    below = rng.random(len(values)) < 0.5
+    if values.dtype.kind == 'f' or isinstance(low, float):
+        offsets = np.round(rng.uniform(0.01, 100, len(values)), 2)
+        return np.round(np.where(below, low - offsets, high + offsets), 2)
+    offsets = rng.integers(1, 100, len(values))
+    return np.where(below, low - offsets, high + offsets)
+
+
+def _mutate_wrong_type(rng, values, rule):
+    # Zahlen und Wahrheitswerte als Text, Text als Zahl
+    if values.dtype.kind == 'b':
+        return np.where(values, 'ja', 'nein').astype(object)
+    if values.dtype.kind in 'iuf':
+        return values.astype(str).astype(object)
+    return rng.integers(0, 10 ** 6, len(values)).astype(object)
+
+
+def _mutate_mismatch(rng, values, rule):
+    # Ein Zeichen durch ein anderes ersetzen, z.B. damit passwort_wiederholen nicht mehr übereinstimmt
+    positions = rng.random(len(values))
+    shifts = rng.integers(1, len(PASSWORD_ALPHABET), len(values))
+    result = []
+    for value, position, shift in zip(_as_strings(values), positions, shifts):
+        if not value:
+            result.append(PASSWORD_ALPHABET[shift])
+            continue
+        index = int(position * len(value))
+        char = PASSWORD_ALPHABET[(PASSWORD_ALPHABET.find(value[index]) + shift) % len(PASSWORD_ALPHABET)]
+        result.append(value[:index] + char + value[index + 1:])
+    return np.array(result, dtype=object)
+
+
+def _mutate_unknown_value(rng, values, rule):
+    return np.array(rule['werte'], dtype=object)[rng.integers(0, len(rule['werte']), len(values))]
+
+
+# Operator -> (Funktion, erforderliche Parameter)
+MUTATION_OPERATORS = {
+    'kürzen': (_mutate_truncate, ('länge',)),
+    'verlängern': (_mutate_extend, ('länge',)),
+    'verbotene_zeichen': (_mutate_forbidden_chars, ('zeichen',)),
+    'ohne_zeichen': (_mutate_without_chars, ('zeichen',)),
+    'leer': (_mutate_empty, ()),
+    'außerhalb_bereich': (_mutate_out_of_range, ('bereich',)),
+    'falscher_typ': (_mutate_wrong_type, ()),
+    'abweichend': (_mutate_mismatch, ()),
+    'unbekannter_wert': (_mutate_unknown_value, ('werte',)),
+}
+
+
+def check_mutation_rules(rules, fields):
+    for rule in rules:
+        if rule.get('feld') not in fields:
+            raise ValueError(f'Mutationsregel für unbekanntes Feld {rule.get("feld")}')
+        for field in rule.get('auch', []):
+            if field not in fields:
+                raise ValueError(f'Mutationsregel für unbekanntes Feld {field}')
+        if rule.get('operator') not in MUTATION_OPERATORS:
+            raise ValueError(f'Unbekannter Mutationsoperator: {rule.get("operator")}')
+        missing = [name for name in MUTATION_OPERATORS[rule['operator']][1] if name not in rule]
+        if missing:
+            raise ValueError(f'Mutationsregel {rule["feld"]}:{rule["operator"]} braucht {", ".join(missing)}')
+        if rule.get('gewicht', 1) < 0:
+            raise ValueError(f'Mutationsregel {rule["feld"]}:{rule["operator"]} hat ein negatives Gewicht')
+
+
+def _suffix_position(value, anchor):
+    # Das Suffix steht direkt vor dem letzten Vorkommen von anchor, ohne anchor am Ende des Werts
+    index = value.rfind(anchor) if anchor else -1
+    return len(value) if index < 0 else index
+
+
+def _strip_suffix(value, anchor):
+    position = _suffix_position(value, anchor)
+    return value[:position - UNIQUE_SUFFIX_LENGTH] + value[position:]
+
+
+def _insert_suffix(value, suffix, anchor):
+    # Mutierte Werte ohne anchor (z.B. E-Mail ohne '@') erhalten das Suffix am Ende; sie unterscheiden
+    # sich damit untereinander und von allen Werten mit anchor
+    position = _suffix_position(value, anchor)
+    return value[:position] + suffix + value[position:]
+
+
+def rule_name(rule, kind):
+    # Wert der Spalte 'verletzte_regel': optionaler Name der Regel, sonst "feld:art"
+    return rule.get('name') or f'{rule["feld"]}:{kind}'
+
+
+# Platzhalter von fake.bothify: Zeichen, aus denen gezogen wird, und ob der Platzhalter auch leer bleiben kann
+BOTHIFY_PLACEHOLDERS = {
+    '#': (string.digits, False),
+    '%': (string.digits[1:], False),
+    '$': (string.digits[2:], False),
+    '!': (string.digits, True),
+    '@': (string.digits[1:], True),
+    '?': (string.ascii_letters, False)
+}
+
+
+def bothify_column(rng, pattern, n):
+    # Vektorisierte Variante von fake.bothify(pattern) auf einer Zeichenmatrix; jeder Platzhalter wird je Zeile
+    # gezogen, die Anzahl verschiedener Werte ist daher nicht durch einen Pool begrenzt
+    if not pattern:
+        return np.full(n, '', dtype=object)
+    template = np.array([ord(char) for char in pattern], dtype=np.uint32)
+    chars = np.tile(template, (n, 1))
+    optional = False
+    for placeholder, (alphabet, may_be_empty) in BOTHIFY_PLACEHOLDERS.items():
+        positions = np.flatnonzero(template == ord(placeholder))
+        if not len(positions):
+            continue
+        codes = np.array([ord(char) for char in alphabet], dtype=np.uint32)
+        drawn = codes[rng.integers(0, len(codes), (n, len(positions)))]
+        if may_be_empty:
+            drawn[rng.random((n, len(positions))) < 0.5] = 0
+            optional = True
+        chars[:, positions] = drawn
+    if optional:
+        # Leer gebliebene Platzhalter (0) ans Zeilenende schieben, wo sie beim Umwandeln in Text wegfallen
+        chars = np.take_along_axis(chars, np.argsort(chars == 0, axis=1, kind='stable'), axis=1)
+    return chars.view(f'U{len(pattern)}').ravel().astype(object)
+
+
+@lru_cache(maxsize=1)
+def _schema_faker():
+    # Faker-Instanz mit allen unterstützten Locales, nur zum Prüfen der Faker-Provider beim Laden der Schemas
+    from faker import Faker
+    return Faker(SUPPORTED_LOCALES)
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+# Deklarative Schemas: eigene Datentypen werden als JSON/YAML beschrieben und einmal pro Generator
+# zu Erzeugern kompiliert, sodass pro Datensatz nur noch vorab gebundene Funktionen aufgerufen werden
+class RecordSchema:
+    FIELD_KINDS = ('faker', 'ganzzahl', 'kommazahl', 'auswahl', 'muster', 'bool', 'wert')
+
+    def __init__(self, definition):
+        self.name = definition.get('name')
+        self.fields = definition.get('felder')
+        self.invalid_rules = definition.get('ungültig', [])
+        self.digest = hashlib.sha256(json.dumps(definition, sort_keys=True).encode('utf-8')).hexdigest()
+        # Faker-Provider mit nicht serialisierbaren Werten (z.B. Datumsobjekten), die als Text ausgegeben werden
+        self._text_providers = set()
+        if not isinstance(self.name, str) or not self.name:
+            raise ValueError('Ungültiges Schema: "name" fehlt')
+        if self.name in DATA_TYPES:
+            raise ValueError(f'Ungültiges Schema {self.name}: Name ist bereits ein eingebauter Datentyp')
+        if not isinstance(self.fields, dict) or not self.fields:
+            raise ValueError(f'Ungültiges Schema {self.name}: "felder" fehlt')
+        for field, spec in self.fields.items():
+            self._check_spec(field, spec)
+        for rule in self.invalid_rules:
+            if rule.get('feld') not in self.fields:
+                raise ValueError(f'Ungültiges Schema {self.name}: Regel für unbekanntes Feld {rule.get("feld")}')
+            self._check_spec(rule['feld'], {key: value for key, value in rule.items()
+                                            if key not in ('feld', 'gewicht', 'name')})
+            if not _is_number(rule.get('gewicht', 1)) or rule.get('gewicht', 1) < 0:
+                raise ValueError(f'Ungültiges Schema {self.name}: Regel für Feld {rule["feld"]} hat ein negatives Gewicht')
+        if self.invalid_rules and not sum(rule.get('gewicht', 1) for rule in self.invalid_rules) > 0:
+            raise ValueError(f'Ungültiges Schema {self.name}: alle ungültig-Regeln haben das Gewicht 0')
+
+    def _kind(self, spec):
+        kinds = [kind for kind in self.FIELD_KINDS if kind in spec]
+        return kinds[0] if len(kinds) == 1 else None
+
+    def _check_spec(self, field, spec):
+        kind = self._kind(spec) if isinstance(spec, dict) else None
+        if kind is None:
+            raise ValueError(f'Ungültiges Schema {self.name}: Feld {field} braucht genau eine Angabe aus {", ".join(self.FIELD_KINDS)}')
+        if kind in ('ganzzahl', 'kommazahl') and (len(spec[kind]) != 2 or spec[kind][0] > spec[kind][1]):
+            raise ValueError(f'Ungültiges Schema {self.name}: Feld {field} braucht einen Bereich [min, max]')
+        if kind == 'auswahl':
+            if not isinstance(spec['auswahl'], list) or not spec['auswahl']:
+                raise ValueError(f'Ungültiges Schema {self.name}: Feld {field} braucht mindestens einen Wert in "auswahl"')
+            weights = spec.get('gewichte')
+            if weights is not None:
+                if not isinstance(weights, list) or len(weights) != len(spec['auswahl']):
+                    raise ValueError(f'Ungültiges Schema {self.name}: Feld {field} hat nicht gleich viele Gewichte wie Werte')
+                if not all(_is_number(weight) and weight >= 0 for weight in weights) or not sum(weights) > 0:
+                    raise ValueError(f'Ungültiges Schema {self.name}: Feld {field} braucht nicht negative Gewichte mit positiver Summe')
+        if kind == 'bool' and (not _is_number(spec['bool']) or not 0 <= spec['bool'] <= 1):
+            raise ValueError(f'Ungültiges Schema {self.name}: Feld {field} braucht für "bool" eine Wahrscheinlichkeit zwischen 0 und 1')
+        if kind == 'faker':
+            self._check_provider(field, spec)
+
+    def _check_provider(self, field, spec):
+        # Der Provider muss in allen unterstützten Locales existieren, da Anfragen jede Auswahl davon nutzen können;
+        # ein Probeaufruf prüft die Argumente und den Typ der Werte
+        provider = spec['faker']
+        fake = _schema_faker()
+        if not isinstance(provider, str) or not all(hasattr(fake[locale], provider) for locale in fake.locales):
+            raise ValueError(f'Ungültiges Schema {self.name}: Unbekannter Faker-Provider {provider} für Feld {field}')
+        try:
+            value = getattr(fake, provider)(**spec.get('argumente', {}))
+        except Exception as error:
+            raise ValueError(f'Ungültiges Schema {self.name}: Faker-Provider {provider} für Feld {field} '
+                             f'schlägt fehl: {error}') from error
+        if not isinstance(value, (str, int, float, bool)):
+            self._text_providers.add(provider)
+
+    def _field_factory(self, spec, generator):
+        # Bindet die Zufallsquelle des Generators; zwischengespeichert über compiled
+        kind = self._kind(spec)
+        if kind == 'faker':
+            factory = partial(getattr(generator.fake, spec['faker']), **spec.get('argumente', {}))
+            # Nicht serialisierbare Werte (z.B. Datumsobjekte) werden als Text ausgegeben
+            if spec['faker'] in self._text_providers:
+                factory = partial(lambda inner: str(inner()), factory)
+        elif kind == 'ganzzahl':
+            factory = partial(generator.random.randint, *spec['ganzzahl'])
+        elif kind == 'kommazahl':
+            low, high = spec['kommazahl']
+            digits = spec.get('nachkommastellen', 2)
+            uniform = generator.random.uniform
+            factory = lambda: round(uniform(low, high), digits)
+        elif kind == 'auswahl':
+            values = spec['auswahl']
+            weights = spec.get('gewichte')
+            if weights:
+                choices = generator.random.choices
+                factory = lambda: choices(values, weights)[0]
+            else:
+                factory = partial(generator.random.choice, values)
+        elif kind == 'muster':
+            factory = partial(generator.fake.bothify, spec['muster'])
+        elif kind == 'bool':
+            probability = spec['bool']
+            rand = generator.random.random
+            factory = lambda: rand() < probability
+        else:
+            value = spec['wert']
+            factory = lambda: value
+        max_length = spec.get('max_länge')
+        if max_length is not None:
+            factory = partial(lambda inner: str(inner())[:max_length], factory)
+        return factory
+
+    def retyped_fields(self):
+        # Felder, deren ungültige Werte einen anderen Typ haben können als die gültigen
+        retyped = set()
+        for rule in self.invalid_rules:
+            kind = self._kind(rule)
+            if kind != self._kind(self.fields[rule['feld']]) or kind in ('auswahl', 'wert'):
+                retyped.add(rule['feld'])
+        return retyped
+
+    def compiled(self, generator, key, spec):
+        # Kompiliert einen Erzeuger einmal je Generator (nicht je Shard oder Batch)
+        cache = generator._compiled.setdefault(self, {})
+        factory = cache.get(key)
+        if factory is None:
+            factory = cache[key] = self._field_factory(spec, generator)
+        return factory
+
+    def record_factories(self, generator):
+        cache = generator._compiled.setdefault(self, {})
+        if 'datensatz' not in cache:
+            cache['datensatz'] = self._record_factories(generator)
+        return cache['datensatz']
+
+    def _record_factories(self, generator):
+        fields =[(field, self.compiled(generator, f'{self.name}.{field}', spec)) for field, spec in self.fields.items()]
+
+        def valid_factory():
+            return {field: factory() for field, factory in fields}
+
+        if not self.invalid_rules:
+            return valid_factory, valid_factory
+
+        rules = [(rule['feld'], self.compiled(generator, f'{self.name}.ungültig.{index}', rule),
+                  rule_name(rule, self._kind(rule)))
+                 for index, rule in enumerate(self.invalid_rules)]
+        weights = [rule.get('gewicht', 1) for rule in self.invalid_rules]
+        choices = generator.random.choices
+
+        def invalid_factory():
+            # Gültiger Datensatz, in dem genau eine Regel verletzt wird
+            record = valid_factory()
+            field, factory, name = choices(rules, weights)[0]
+            record[field] = factory()
+            record['verletzte_regel'] = name
+            return record
+
+        return valid_factory, invalid_factory
+
+    def _column(self, spec, generator, n, pool_name):
+        # Vektorisierte Variante von _field_factory für die Batch-Generierung
+        kind = self._kind(spec)
+        if kind == 'ganzzahl':
+            low, high = spec['ganzzahl']
+            column = generator.rng.integers(low, high + 1, n)
+        elif kind == 'kommazahl':
+            low, high = spec['kommazahl']
+            column = np.round(generator.rng.uniform(low, high, n), spec.get('nachkommastellen', 2))
+        elif kind == 'auswahl':
+            values = np.array(spec['auswahl'], dtype=object)
+            weights = spec.get('gewichte')
+            probabilities = np.array(weights, dtype=float) / sum(weights) if weights else None
+            column = values[generator.rng.choice(len(values), n, p=probabilities)]
+        elif kind == 'bool':
+            column = generator.rng.random(n) < spec['bool']
+        elif kind == 'wert':
+            column = np.full(n, spec['wert'], dtype=object)
+        elif kind == 'muster':
+            column = bothify_column(generator.rng, spec['muster'], n)
+        else:
+            # Faker-Werte aus einem Pool, der mit n wächst
+            column = generator._sample(pool_name, self.compiled(generator, pool_name, spec), n, scaled_pool_size(n))
+        max_length = spec.get('max_länge')
+        if max_length is not None:
+            import pandas as pd
+            column = pd.Series(column).astype(str).str.slice(0, max_length).to_numpy(dtype=object)
+        return column
+
+    def batch_columns(self, generator, n, valid=True):
+        columns = {field: self._column(spec, generator, n, f'{self.name}.{field}')
+                   for field, spec in self.fields.items()}
+        if valid or not self.invalid_rules:
+            return columns
+        weights = np.array([rule.get('gewicht', 1) for rule in self.invalid_rules], dtype=float)
+        rule_index = generator.rng.choice(len(self.invalid_rules), n, p=weights / weights.sum())
+        violated = np.empty(n, dtype=object)
+        for index, rule in enumerate(self.invalid_rules):
+            mask = rule_index == index
+            count = int(mask.sum())
+            if count:
+                column = columns[rule['feld']].astype(object)
+                column[mask] = self._column(rule, generator, count, f'{self.name}.ungültig.{index}')
+                columns[rule['feld']] = column
+                violated[mask] = rule_name(rule, self._kind(rule))
+        columns['verletzte_regel'] = violated
+        return columns
+
+
+def build_index(keys, num_keys):
+    # Array-basierter Index (CSR): die Positionen zu Schlüssel k liegen in positions[offsets[k]:offsets[k + 1]]
+    keys = np.asarray(keys)
+    offsets = np.zeros(num_keys + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys, minlength=num_keys), out=offsets[1:])
+    positions = np.argsort(keys, kind='stable')
+    return offsets, positions
+
+
+def load_schemas(directory=SCHEMA_DIR):
+    # Lädt alle Schemas (*.json, mit PyYAML auch *.yaml/*.yml) aus dem Verzeichnis
+    patterns = ['*.json'] + (['*.yaml', '*.yml'] if yaml is not None else [])
+    loaded = {}
+    for pattern in patterns:
+        for path in sorted(glob.glob(os.path.join(directory, pattern))):
+            with open(path, encoding='utf-8') as file:
+                definition = json.load(file) if path.endswith('.json') else yaml.safe_load(file)
+            schema = RecordSchema(definition)
+            if schema.name in loaded:
+                raise ValueError(f'Schema {schema.name} ist mehrfach definiert')
+            loaded[schema.name] = schema
+    return loaded
+
+
+class SchemaRegistry(Mapping):
+    # Lädt die Schemas erst beim ersten Zugriff, da die Prüfung der Faker-Provider Faker importiert
+    def __init__(self, directory=SCHEMA_DIR):
+        self.directory = directory
+        self._schemas = None
+
+    def _loaded(self):
+        if self._schemas is None:
+            self._schemas = load_schemas(self.directory)
+        return self._schemas
+
+    def __getitem__(self, name):
+        return self._loaded()[name]
+
+    def __iter__(self):
+        return iter(self._loaded())
+
+    def __len__(self):
+        return len(self._loaded())
+
+
+schemas = SchemaRegistry()
+
+
+def available_data_types():
+    return DATA_TYPES + list(schemas)
+
+
+# Wiederverwendete Generatoren: je Thread (und damit je Worker-Prozess) einer pro Locale-Auswahl,
+# da der Aufbau von Faker deutlich teurer ist als kleine Anfragen
+_generator_cache = local()
+
+
+def normalize_locales(locales):
+    # Locale-Auswahl ohne Duplikate in der Reihenfolge von SUPPORTED_LOCALES (andere Locales dahinter), damit
+    # dieselbe Auswahl unabhängig von der Schreibweise denselben Generator, Cache-Schlüssel und dieselben Daten ergibt
+    selected = dict.fromkeys(locales or SUPPORTED_LOCALES)
+    return ([value for value in SUPPORTED_LOCALES if value in selected]
+            + [value for value in selected if value not in SUPPORTED_LOCALES])
+
+
+def get_generator(locales=None, seed=None):
+    locales = tuple(normalize_locales(locales))
+    generators = getattr(_generator_cache, 'generators', None)
+    if generators is None:
+        generators = _generator_cache.generators = {}
+    generator = generators.get(locales)
+    if generator is None:
+        with timed(GENERATOR_SETUP_SECONDS, 'generator'):
+            generator = generators[locales] = TestDataGenerator(seed, locales)
+    elif seed is not None:
+        generator.reseed(seed)
+    return generator
+
+
+def parse_locales(locale):
+    # Kommagetrennte Locale-Liste aus der Anfrage; None bedeutet alle unterstützten Locales
+    if locale is None:
+        return None
+    locales = [value.strip() for value in locale.split(',') if value.strip()]
+    unknown = [value for value in locales if value not in SUPPORTED_LOCALES]
+    if not locales or unknown:
+        raise ValueError(f"Ungültige Locale: {', '.join(unknown) or locale}")
+    return normalize_locales(locales)
+
+
+# Parallele Generierung mit reproduzierbaren Shards
+def shard_tasks(data_type, num_records, seed=None, kinds=(True, False), locales=None):
+    # Die Aufteilung in Shards und deren Sub-Seeds hängen nur von `seed` ab, nicht von der Worker-Anzahl
+    sizes = [min(SHARD_SIZE, num_records - start) for start in range(0, num_records, SHARD_SIZE)]
+    tasks = []
+    for size, sequence in zip(sizes, np.random.SeedSequence(seed).spawn(len(sizes))):
+        # Gültige und ungültige Datensätze erhalten getrennte Seeds, damit die gültigen Daten
+        # gleich bleiben, egal ob ungültige mit angefordert werden
+        valid_seed, invalid_seed = (int(value) for value in sequence.generate_state(2))
+        seeds = {True: valid_seed, False: invalid_seed}
+        tasks.append((data_type, size, [(valid, seeds[valid]) for valid in kinds], locales))
+    return tasks
+
+
+def generate_shard(task, generator=None):
+    # generator: optional vorhandener Generator mit denselben Locales (sonst der thread-lokale aus get_generator)
+    data_type, num_records, seeds, locales = task
+    generator = generator or get_generator(locales)
+    results = []
+    for valid, shard_seed in seeds:
+        with timed(GENERATION_SECONDS, 'generierung', datentyp=data_type, gueltig=valid):
+            generator.reseed(shard_seed)
+            results.append(generator.generate_list(data_type, num_records, valid))
+    return results
+
+
+def count_records(data_type, kinds, shard):
+    # Zählt im aufrufenden Prozess, damit auch Shards aus Worker-Prozessen erfasst werden
+    for valid, records in zip(kinds, shard):
+        RECORDS_GENERATED.inc(len(records), datentyp=data_type, gueltig=valid)
+    return shard
+
+
+def iter_shards(data_type, num_records, seed=None, workers=1, kinds=(True, False), locales=None, generator=None):
+    # Liefert die Shards in Reihenfolge; je Shard eine Liste von Datensätzen pro angefordertem Typ.
+    # generator wird nur ohne Worker-Prozesse verwendet, Worker-Prozesse nutzen ihren eigenen
+    tasks = shard_tasks(data_type, num_records, seed, kinds, locales)
+    if workers <= 1:
+        for task in tasks:
+            yield count_records(data_type, kinds, generate_shard(task, generator))
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Begrenzter Vorlauf, damit beim Streaming nicht alle Shards gleichzeitig im Speicher liegen
+        pending = deque()
+        for task in tasks:
+            pending.append(executor.submit(generate_shard, task))
+            if len(pending) >= 2 * workers:
+                yield count_records(data_type, kinds, pending.popleft().result())
+        while pending:
+            yield count_records(data_type, kinds, pending.popleft().result())
+
+
+def generate_records(data_type, num_records, seed=None, workers=1, kinds=(True, False), locales=None,
+                     generator=None):
+    # Führt die Shards zu je einer Liste pro angefordertem Typ zusammen
+    merged = [[] for _ in kinds]
+    for shard in iter_shards(data_type, num_records, seed, workers, kinds, locales, generator):
+        for records, shard_records in zip(merged, shard):
+            records.extend(shard_records)
+    return merged
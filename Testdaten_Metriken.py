@@ -0,0 +1,212 @@
+import os
+import sys
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Thread, Lock, Event, get_ident
+
+# Instrumentierung ohne externe Abhängigkeiten: Zähler und Histogramme im Prometheus-Textformat,
+# Zeiten je Verarbeitungsschritt für den Server-Timing-Header und ein zuschaltbarer Sampling-Profiler.
+# Jeder Prozess hat eigene Werte; Zeiten aus Worker-Prozessen (workers > 1) werden nicht erfasst
+
+# Histogramm-Grenzen in Sekunden
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+# Server-Timing-Header für alle Antworten; einzelne Anfragen aktivieren ihn mit "X-Server-Timing: 1"
+SERVER_TIMING = os.environ.get('TESTDATEN_SERVER_TIMING') == '1'
+# Die Profiler-Endpunkte sind nur verfügbar, wenn sie ausdrücklich freigeschaltet sind
+PROFILER_ENABLED = os.environ.get('TESTDATEN_PROFILER') == '1'
+# Standard-Abtastintervall des Profilers in Sekunden
+PROFILER_INTERVAL = 0.01
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+class Metric:
+    type = None
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.values = {}
+        self.lock = Lock()
+        registry.append(self)
+
+    def _key(self, labels):
+        if set(labels) != set(self.labels):
+            raise ValueError(f'{self.name} erwartet die Labels {", ".join(self.labels)}')
+        return tuple(str(value).lower() if isinstance(value, bool) else str(value)
+                     for value in (labels[name] for name in self.labels))
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.type}']
+        with self.lock:
+            items = sorted(self.values.items())
+            for key, value in items:
+                lines.extend(self._render_value(key, value))
+        return lines
+
+    def clear(self):
+        with self.lock:
+            self.values.clear()
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def get(self, **labels):
+        return self.values.get(self._key(labels), 0)
+
+    def _render_value(self, key, value):
+        return [f'{self.name}{_format_labels(self.labels, key)} {value}']
+
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), buckets=BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = buckets
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self.lock:
+            entry = self.values.get(key)
+            if entry is None:
+                entry = self.values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[0][index] += 1
+                    break
+            entry[1] += value
+            entry[2] += 1
+
+    def _render_value(self, key, value):
+        counts, total, count = value
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            lines.append(f'{self.name}_bucket{_format_labels(self.labels, key, [("le", bound)])} {cumulative}')
+        lines.append(f'{self.name}_bucket{_format_labels(self.labels, key, [("le", "+Inf")])} {count}')
+        lines.append(f'{self.name}_sum{_format_labels(self.labels, key)} {total}')
+        lines.append(f'{self.name}_count{_format_labels(self.labels, key)} {count}')
+        return lines
+
+
+registry = []
+
+
+def render_metrics():
+    # Alle registrierten Metriken im Prometheus-Textformat (Version 0.0.4)
+    return '\n'.join(line for metric in registry for line in metric.render()) + '\n'
+
+
+RECORDS_GENERATED = Counter('testdaten_datensaetze_total', 'Generierte Datensätze je Datentyp', ('datentyp', 'gueltig'))
+GENERATOR_SETUP_SECONDS = Histogram('testdaten_generator_aufbau_sekunden', 'Aufbau eines Generators (Faker mit allen Locales)')
+GENERATION_SECONDS = Histogram('testdaten_generierung_sekunden', 'Generierung eines Shards je Datentyp', ('datentyp', 'gueltig'))
+ADJUSTMENTS = Counter('testdaten_anpassungen_total', 'Nachträglich gekürzte oder aufgefüllte Werte je Feld', ('feld', 'art'))
+SERIALIZATION_SECONDS = Histogram('testdaten_serialisierung_sekunden', 'Serialisierung der API-Antworten', ('format',))
+COMPRESSION_SECONDS = Histogram('testdaten_kompression_sekunden', 'Komprimierung der API-Antworten', ('kodierung',))
+EXPORT_SECONDS = Histogram('testdaten_export_sekunden', 'Export eines Datenbestands je Format', ('format',))
+JOB_SECONDS = Histogram('testdaten_job_sekunden', 'Laufzeit der Hintergrund-Jobs je Format', ('format', 'status'))
+REQUEST_SECONDS = Histogram('testdaten_anfrage_sekunden', 'Dauer der API-Anfragen', ('pfad', 'methode', 'status'))
+
+
+# Zeiten je Verarbeitungsschritt der aktuellen Anfrage (None außerhalb von Anfragen)
+_stages = ContextVar('testdaten_stages', default=None)
+
+
+def start_stages():
+    stages = []
+    _stages.set(stages)
+    return stages
+
+
+@contextmanager
+def timed(histogram, stage=None, **labels):
+    # Misst den Block für das Histogramm und, innerhalb einer Anfrage, als Schritt für Server-Timing
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        histogram.observe(elapsed, **labels)
+        stages = _stages.get()
+        if stage is not None and stages is not None:
+            stages.append((stage, elapsed))
+
+
+def server_timing(stages, total=None):
+    # Fasst mehrfach gemessene Schritte (z.B. je Shard) zusammen: "generierung;dur=12.3, ..."
+    durations = {}
+    for stage, elapsed in stages:
+        durations[stage] = durations.get(stage, 0.0) + elapsed
+    if total is not None:
+        durations['gesamt'] = total
+    return ', '.join(f'{stage};dur={elapsed * 1000:.1f}' for stage, elapsed in durations.items())
+
+
+class SamplingProfiler:
+    # Tastet in festen Abständen die Stacks aller Threads ab und zählt sie im "collapsed"-Format
+    # (eine Zeile "a;b;c anzahl" je Stack), das Flamegraph-Werkzeuge direkt einlesen
+    def __init__(self):
+        self.samples = {}
+        self.lock = Lock()
+        self.thread = None
+        self.stop_event = Event()
+
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self, interval=PROFILER_INTERVAL):
+        with self.lock:
+            if self.running:
+                return False
+            self.samples = {}
+            self.stop_event = Event()
+            self.thread = Thread(target=self._run, args=(interval, self.stop_event), daemon=True,
+                                 name='testdaten-profiler')
+            self.thread.start()
+            return True
+
+    def stop(self):
+        with self.lock:
+            if not self.running:
+                return False
+            self.stop_event.set()
+            self.thread.join()
+            return True
+
+    def _run(self, interval, stop_event):
+        own_id = get_ident()
+        while not stop_event.wait(interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+                    frame = frame.f_back
+                key = ';'.join(reversed(stack))
+                self.samples[key] = self.samples.get(key, 0) + 1
+
+    def collapsed(self):
+        samples = dict(self.samples)
+        return ''.join(f'{stack} {count}\n' for stack, count in sorted(samples.items(), key=lambda item: -item[1]))
+
+
+profiler = SamplingProfiler()
@@ -1,12 +1,26 @@
 import datetime
 import sys
+import time
+import tempfile
 import unittest
 from unittest.mock import patch, MagicMock
 from fastapi.testclient import TestClient
-from Bench_Projekt_API import app, TestDataGenerator
+import Testdaten_Metriken
+from Testdaten_API import app, result_cache, ResultCache
+from Testdaten_Generator import TestDataGenerator, generate_records, get_generator, SHARD_SIZE, RecordSchema, \
+    load_schemas, build_index, RecordStore, normalize_locales
+import io
 import json
+import re
 import pandas as pd
-from openpyxl import Workbook
+import numpy as np
+from openpyxl import Workbook, load_workbook
+import dicttoxml
+import subprocess
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
 import os
 from unittest.loader import TestLoader
 from unittest.runner import TextTestRunner
@@ -211,6 +225,521 @@ class TestAPI(unittest.TestCase):
         except AssertionError as e:
             self.log_result("test_generate_non_integer", "Failed", str(e))
 
+    def test_generate_stream_ndjson(self):
+        # Gestreamte Anfragen liefern je Datensatz eine JSON-Zeile (gültig + ungültig)
+        try:
+            response = self.client.get("/generate/login/3?stream=ndjson")
+            self.assertEqual(response.status_code, 200)
+            lines = [json.loads(line) for line in response.text.splitlines()]
+            self.assertEqual(len(lines), 6)
+            self.assertEqual([line['gültig'] for line in lines[:2]], [True, False])
+            self.log_result("test_generate_stream_ndjson", "Passed")
+        except AssertionError as e:
+            self.log_result("test_generate_stream_ndjson", "Failed", str(e))
+
+    def test_generate_stream_csv_above_limit(self):
+        # Die 10000er-Grenze gilt nicht für gestreamte Anfragen
+        try:
+            response = self.client.get("/generate/bestellung/10001?stream=csv")
+            self.assertEqual(response.status_code, 200)
+            lines = response.text.splitlines()
+            self.assertEqual(lines[0], 'gültig,produkt,menge,preis,währung,verletzte_regel')
+            self.assertEqual(len(lines), 1 + 2 * 10001)
+            self.log_result("test_generate_stream_csv_above_limit", "Passed")
+        except AssertionError as e:
+            self.log_result("test_generate_stream_csv_above_limit", "Failed", str(e))
+
+    def test_generate_stream_invalid_format(self):
+        try:
+            response = self.client.get("/generate/login/3?stream=pdf")
+            self.assertEqual(response.status_code, 400)
+            self.log_result("test_generate_stream_invalid_format", "Passed")
+        except AssertionError as e:
+            self.log_result("test_generate_stream_invalid_format", "Failed", str(e))
+
+    def test_generate_batch_columns(self):
+        # Batch-Generierung liefert dieselben Spalten wie die Einzel-Generatoren
+        try:
+            for data_type, single in (('bestellung', self.generator.generate_bestellung),
+                                      ('profil', self.generator.generate_profile),
+                                      ('login', self.generator.generate_login),
+                                      ('registrierung', self.generator.generate_registration)):
+                df = self.generator.generate_batch(data_type, 50)
+                self.assertEqual(len(df), 50)
+                self.assertEqual(list(df.columns), list(single()))
+            self.log_result("test_generate_batch_columns", "Passed")
+        except AssertionError as e:
+            self.log_result("test_generate_batch_columns", "Failed", str(e))
+
+    def test_generate_batch_value_ranges(self):
+        try:
+            orders = self.generator.generate_batch('bestellung', 1000)
+            self.assertTrue(orders['menge'].between(1, 5).all())
+            self.assertTrue((orders['preis'] <= orders['menge'] * 10.0).all())
+            profiles = self.generator.generate_batch('profil', 1000)
+            self.assertTrue(profiles['alter'].between(18, 99).all())
+            self.assertTrue(profiles['geschlecht'].isin(self.generator.genders).all())
+            registrations = self.generator.generate_batch('registrierung', 100)
+            self.assertTrue((registrations['passwort'] == registrations['passwort_wiederholen']).all())
+            self.log_result("test_generate_batch_value_ranges", "Passed")
+        except AssertionError as e:
+            self.log_result("test_generate_batch_value_ranges", "Failed", str(e))
+
+    def test_generated_credentials_valid(self):
+        # Benutzernamen und Passwörter sind per Konstruktion gültig
+        try:
+            password_pattern = re.compile(r'^(?=.*[a-z])(?=.*[A-Z])(?=.*\d)(?=.*[@$!%*?])[a-zA-Z0-9@$!%*?]{8,20}$')
+            for _ in range(1000):
+                self.assertRegex(self.generator.generate_username(), r'^[a-zA-Z0-9ÄÖÜäöü]{4,12}$')
+                self.assertRegex(self.generator.generate_password(), password_pattern)
+            for password in self.generator.generate_batch('login', 1000)['passwort']:
+                self.assertRegex(password, password_pattern)
+            self.log_result("test_generated_credentials_valid", "Passed")
+        except AssertionError as e:
+            self.log_result("test_generated_credentials_valid", "Failed", str(e))
+
+    def test_generated_credentials_invalid(self):
+        # Einzelne ungültige Benutzernamen und Passwörter bleiben nicht-leere Zeichenketten und verletzen die Regeln
+        try:
+            password_pattern = re.compile(r'^(?=.*[a-z])(?=.*[A-Z])(?=.*\d)(?=.*[@$!%*?])[a-zA-Z0-9@$!%*?]{8,20}$')
+            for _ in range(1000):
+                username = self.generator.generate_username(valid=False)
+                password = self.generator.generate_password(valid=False)
+                self.assertIsInstance(username, str)
+                self.assertIsInstance(password, str)
+                self.assertTrue(username and password)
+                self.assertNotRegex(username, r'^[a-zA-Z0-9ÄÖÜäöü]{4,12}$')
+                self.assertNotRegex(password, password_pattern)
+            self.log_result("test_generated_credentials_invalid", "Passed")
+        except AssertionError as e:
+            self.log_result("test_generated_credentials_invalid", "Failed", str(e))
+
+    def test_seeded_generation_independent_of_workers(self):
+        # Gleicher Seed liefert unabhängig von der Worker-Anzahl identische Daten
+        try:
+            num_records = 2 * SHARD_SIZE + 5
+            sequential = generate_records('registrierung', num_records, seed=42, workers=1)
+            parallel = generate_records('registrierung', num_records, seed=42, workers=3)
+            self.assertEqual(sequential, parallel)
+            self.assertEqual(len(sequential[0]), num_records)
+            valid_only = generate_records('registrierung', num_records, seed=42, kinds=(True,))
+            self.assertEqual(valid_only[0], sequential[0])
+            # Ein übergebener Generator (z.B. der gecachte der Streamlit-App) liefert dieselben Daten
+            generator = TestDataGenerator(locales=list(normalize_locales(None)))
+            self.assertEqual(generate_records('registrierung', num_records, seed=42, generator=generator), sequential)
+            self.log_result("test_seeded_generation_independent_of_workers", "Passed")
+        except AssertionError as e:
+            self.log_result("test_seeded_generation_independent_of_workers", "Failed", str(e))
+
+    def test_generate_seeded_api(self):
+        try:
+            first = self.client.get("/generate/profil/5?seed=7").json()
+            second = self.client.get("/generate/profil/5?seed=7").json()
+            self.assertEqual(first, second)
+            self.assertEqual(self.client.get("/generate/profil/5?workers=0").status_code, 400)
+            self.log_result("test_generate_seeded_api", "Passed")
+        except AssertionError as e:
+            self.log_result("test_generate_seeded_api", "Failed", str(e))
+
+    def test_generator_reused_per_locale(self):
+        # Generatoren werden je Locale-Auswahl wiederverwendet statt pro Anfrage neu gebaut
+        try:
+            self.assertIs(get_generator(), get_generator())
+            self.assertIs(get_generator(['pl_PL']), get_generator(['pl_PL'], seed=1))
+            self.assertIsNot(get_generator(), get_generator(['pl_PL']))
+            self.assertEqual(get_generator(['pl_PL']).locales, ['pl_PL'])
+            # Reihenfolge und Duplikate der Locale-Auswahl spielen keine Rolle
+            self.assertIs(get_generator(['pl_PL', 'de_DE', 'pl_PL']), get_generator(['de_DE', 'pl_PL']))
+            self.assertEqual(get_generator(['pl_PL', 'de_DE']).locales, ['de_DE', 'pl_PL'])
+            first = self.client.get("/generate/profil/5?seed=4&locale=de_CH,pl_PL,de_CH")
+            second = self.client.get("/generate/profil/5?seed=4&locale=pl_PL,de_CH")
+            self.assertEqual(first.headers["ETag"], second.headers["ETag"])
+            self.assertEqual(first.content, second.content)
+            self.log_result("test_generator_reused_per_locale", "Passed")
+        except AssertionError as e:
+            self.log_result("test_generator_reused_per_locale", "Failed", str(e))
+
+    def test_generate_locale_parameter(self):
+        try:
+            response = self.client.get("/generate/profil/3?locale=pl_PL,de_CH")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(self.client.get("/generate/profil/3?locale=en_US").status_code, 400)
+            self.log_result("test_generate_locale_parameter", "Passed")
+        except AssertionError as e:
+            self.log_result("test_generate_locale_parameter", "Failed", str(e))
+
+    def test_job_lifecycle(self):
+        # Job anlegen, bis zum Abschluss abfragen und das Ergebnis herunterladen
+        try:
+            response = self.client.post("/jobs", json={"data_type": "bestellung", "num_records": 1500,
+                                                       "format": "csv", "seed": 1})
+            self.assertEqual(response.status_code, 202)
+            job_id = response.json()["id"]
+            for _ in range(100):
+                status = self.client.get(f"/jobs/{job_id}").json()
+                if status["status"] in ("fertig", "fehlgeschlagen"):
+                    break
+                time.sleep(0.1)
+            self.assertEqual(status["status"], "fertig")
+            self.assertEqual(status["fortschritt"], 1.0)
+            result = self.client.get(f"/jobs/{job_id}/result")
+            self.assertEqual(result.status_code, 200)
+            self.assertEqual(len(result.text.splitlines()), 1 + 2 * 1500)
+            self.log_result("test_job_lifecycle", "Passed")
+        except AssertionError as e:
+            self.log_result("test_job_lifecycle", "Failed", str(e))
+
+    @unittest.skipIf(pa is None, "pyarrow nicht installiert")
+    def test_job_columnar_small_row_groups(self):
+        # Kleine Row-Groups: Spalten mit falschem Typ dürfen nicht vom ersten Chunk abhängen
+        try:
+            import pyarrow.parquet as pq
+            for format in ("parquet", "arrow", "feather"):
+                job_id = self.client.post("/jobs", json={"data_type": "registrierung", "num_records": 300,
+                                                         "format": format, "row_group_size": 7, "seed": 2}).json()["id"]
+                for _ in range(100):
+                    status = self.client.get(f"/jobs/{job_id}").json()
+                    if status["status"] in ("fertig", "fehlgeschlagen"):
+                        break
+                    time.sleep(0.1)
+                self.assertEqual(status["status"], "fertig", status["fehler"])
+                if format == "parquet":
+                    table = pq.read_table(io.BytesIO(self.client.get(f"/jobs/{job_id}/result").content))
+                    self.assertEqual(table.num_rows, 600)
+                    self.assertEqual(str(table.schema.field("AGB akzeptieren").type), "string")
+            self.log_result("test_job_columnar_small_row_groups", "Passed")
+        except AssertionError as e:
+            self.log_result("test_job_columnar_small_row_groups", "Failed", str(e))
+
+    def test_job_invalid_requests(self):
+        try:
+            self.assertEqual(self.client.post("/jobs", json={"data_type": "login", "num_records": 5,
+                                                             "format": "pdf"}).status_code, 400)
+            self.assertEqual(self.client.post("/jobs", json={"data_type": "unbekannt",
+                                                             "num_records": 5}).status_code, 404)
+            self.assertEqual(self.client.get("/jobs/unbekannt").status_code, 404)
+            self.assertEqual(self.client.get("/jobs/unbekannt/result").status_code, 404)
+            self.log_result("test_job_invalid_requests", "Passed")
+        except AssertionError as e:
+            self.log_result("test_job_invalid_requests", "Failed", str(e))
+
+    def test_negative_seed_rejected(self):
+        # Negative Seeds werden mit 400 abgelehnt statt in NumPy mit 500 (bzw. leerem Stream) zu scheitern
+        try:
+            self.assertEqual(self.client.get("/generate/login/5?seed=-1").status_code, 400)
+            self.assertEqual(self.client.get("/generate/login/5?seed=-1&stream=csv").status_code, 400)
+            self.assertEqual(self.client.get("/generate_relational/3/4?seed=-1").status_code, 400)
+            self.assertEqual(self.client.post("/jobs", json={"data_type": "login", "num_records": 5,
+                                                             "seed": -1}).status_code, 400)
+            self.assertEqual(self.client.get("/generate/login/5?seed=0").status_code, 200)
+            self.log_result("test_negative_seed_rejected", "Passed")
+        except AssertionError as e:
+            self.log_result("test_negative_seed_rejected", "Failed", str(e))
+
+    def test_seeded_result_cache(self):
+        # Wiederholte Anfragen mit Seed werden aus dem Cache bedient und unterstützen ETags
+        try:
+            result_cache.clear()
+            first = self.client.get("/generate/login/20?seed=11")
+            self.assertEqual(first.headers["X-Cache"], "MISS")
+            second = self.client.get("/generate/login/20?seed=11")
+            self.assertEqual(second.headers["X-Cache"], "HIT")
+            self.assertEqual(first.content, second.content)
+            self.assertEqual(first.headers["ETag"], second.headers["ETag"])
+            not_modified = self.client.get("/generate/login/20?seed=11", headers={"If-None-Match": first.headers["ETag"]})
+            self.assertEqual(not_modified.status_code, 304)
+            # Schwacher ETag, da komprimierte und unkomprimierte Antworten dasselbe ETag tragen
+            self.assertTrue(first.headers["ETag"].startswith('W/"'))
+            gzipped = self.client.get("/generate/login/20?seed=11", headers={"Accept-Encoding": "gzip"})
+            self.assertEqual(gzipped.headers["ETag"], first.headers["ETag"])
+            not_modified = self.client.get("/generate/login/20?seed=11", headers={"If-None-Match": first.headers["ETag"][2:]})
+            self.assertEqual(not_modified.status_code, 304)
+            other_format = self.client.get("/generate/login/20?seed=11&stream=csv")
+            self.assertEqual(other_format.headers["X-Cache"], "MISS")
+            self.assertNotIn("ETag", self.client.get("/generate/login/20").headers)
+            self.log_result("test_seeded_result_cache", "Passed")
+        except AssertionError as e:
+            self.log_result("test_seeded_result_cache", "Failed", str(e))
+
+    def test_response_compression(self):
+        # Komprimierung nach Accept-Encoding, auch für gestreamte und gecachte Antworten
+        try:
+            plain = self.client.get("/generate/profil/200?seed=4", headers={"Accept-Encoding": "identity"})
+            self.assertNotIn("Content-Encoding", plain.headers)
+            compressed = self.client.get("/generate/profil/200?seed=4", headers={"Accept-Encoding": "gzip"})
+            self.assertEqual(compressed.headers["Content-Encoding"], "gzip")
+            self.assertLess(compressed.num_bytes_downloaded, len(plain.content))
+            self.assertEqual(compressed.json(), plain.json())
+            streamed = self.client.get("/generate/login/50?stream=ndjson", headers={"Accept-Encoding": "gzip"})
+            self.assertEqual(streamed.headers["Content-Encoding"], "gzip")
+            self.assertEqual(len(streamed.text.splitlines()), 100)
+            self.assertNotIn("Content-Encoding", self.client.get("/generate/login/1", headers={"Accept-Encoding": "gzip"}).headers)
+            self.log_result("test_response_compression", "Passed")
+        except AssertionError as e:
+            self.log_result("test_response_compression", "Failed", str(e))
+
+    def test_api_import_without_ui(self):
+        # Die API lädt weder Streamlit noch pandas, pyarrow oder Faker beim Import
+        try:
+            modules = ['streamlit', 'pandas', 'pyarrow', 'faker', 'dicttoxml', 'xlsxwriter']
+            code = f"import sys, Testdaten_API; print([m for m in {modules!r} if m in sys.modules])"
+            output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                                    cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout
+            self.assertEqual(output.strip(), '[]')
+            self.log_result("test_api_import_without_ui", "Passed")
+        except AssertionError as e:
+            self.log_result("test_api_import_without_ui", "Failed", str(e))
+
+    def test_metrics_and_server_timing(self):
+        # /metrics zählt generierte Datensätze; Server-Timing schlüsselt die Schritte einer Anfrage auf
+        try:
+            before = Testdaten_Metriken.RECORDS_GENERATED.get(datentyp='login', gueltig=True)
+            response = self.client.get("/generate/login/25", headers={"X-Server-Timing": "1"})
+            self.assertIn("generierung;dur=", response.headers["Server-Timing"])
+            self.assertIn("serialisierung;dur=", response.headers["Server-Timing"])
+            self.assertNotIn("Server-Timing", self.client.get("/generate/login/1").headers)
+            metrics = self.client.get("/metrics").text
+            self.assertIn(f'testdaten_datensaetze_total{{datentyp="login",gueltig="true"}} {before + 26}', metrics)
+            self.assertIn('testdaten_anfrage_sekunden_count{pfad="/generate/{data_type}/{num_records}",methode="GET",status="200"}', metrics)
+            self.assertIn('testdaten_generierung_sekunden_bucket{datentyp="login",gueltig="true",le="+Inf"}', metrics)
+            self.log_result("test_metrics_and_server_timing", "Passed")
+        except AssertionError as e:
+            self.log_result("test_metrics_and_server_timing", "Failed", str(e))
+
+    def test_sampling_profiler(self):
+        # Der Profiler ist nur freigeschaltet erreichbar und liefert Stacks im collapsed-Format
+        try:
+            self.assertEqual(self.client.post("/profiler/start").status_code, 404)
+            with patch.object(Testdaten_Metriken, 'PROFILER_ENABLED', True):
+                self.assertEqual(self.client.post("/profiler/start?intervall_ms=1").status_code, 200)
+                self.assertEqual(self.client.post("/profiler/start").status_code, 409)
+                self.client.get("/generate/profil/500")
+                self.assertEqual(self.client.post("/profiler/stop").status_code, 200)
+                profile = self.client.get("/profiler").text
+            self.assertRegex(profile.splitlines()[0], r'^\S.* \d+$')
+            self.log_result("test_sampling_profiler", "Passed")
+        except AssertionError as e:
+            self.log_result("test_sampling_profiler", "Failed", str(e))
+
+    def test_result_cache_eviction(self):
+        try:
+            with tempfile.TemporaryDirectory() as directory:
+                cache = ResultCache(max_bytes=10, directory=directory)
+                cache.put("a", b"12345678")
+                cache.put("b", b"87654321")
+                # Im Speicher verdrängt, aber von der Festplatte wiederherstellbar
+                self.assertEqual(list(cache.entries), ["b"])
+                self.assertEqual(cache.get("a"), b"12345678")
+                self.assertEqual(list(cache.entries), ["a"])
+                # Von einem anderen Prozess verdrängte Dateien führen nicht zu Fehlern
+                cache.entries.clear()
+                with patch("os.utime", side_effect=FileNotFoundError):
+                    self.assertEqual(cache.get("b"), b"87654321")
+                # Verwaiste temporäre Dateien werden beim nächsten Schreiben entfernt
+                orphan = os.path.join(directory, "verwaist.tmp")
+                open(orphan, "wb").close()
+                os.utime(orphan, (0, 0))
+                cache.put("c", b"1")
+                self.assertFalse(os.path.exists(orphan))
+            self.log_result("test_result_cache_eviction", "Passed")
+        except AssertionError as e:
+            self.log_result("test_result_cache_eviction", "Failed", str(e))
+
+    def test_generate_schema_type(self):
+        # Eigene Datentypen aus schemas/ sind wie eingebaute über die API verfügbar
+        try:
+            response = self.client.get("/generate/kundenkarte/20?seed=3")
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            self.assertEqual(len(data["gültige_daten"]), 20)
+            for record in data["gültige_daten"]:
+                self.assertRegex(record["kartennummer"], r"^KK-\d{8}$")
+                self.assertTrue(0 <= record["punkte"] <= 5000)
+                self.assertIn(record["stufe"], ["Bronze", "Silber", "Gold"])
+            # Jeder ungültige Datensatz verletzt mindestens eine Regel
+            for record in data["ungültige_daten"]:
+                self.assertTrue(not re.match(r"^KK-\d{8}$", record["kartennummer"]) or record["punkte"] < 0
+                                or record["stufe"] == "Platin" or record["email"] == "")
+            self.log_result("test_generate_schema_type", "Passed")
+        except AssertionError as e:
+            self.log_result("test_generate_schema_type", "Failed", str(e))
+
+    def test_schema_batch_and_validation(self):
+        try:
+            definition = {"name": "gutschein", "felder": {"code": {"muster": "GS-####"},
+                                                           "wert": {"auswahl": [5, 10, 25]}},
+                          "ungültig": [{"feld": "wert", "ganzzahl": [-10, -1]}]}
+            with tempfile.TemporaryDirectory() as directory:
+                with open(f"{directory}/gutschein.json", "w", encoding="utf-8") as file:
+                    json.dump(definition, file)
+                schema = load_schemas(directory)["gutschein"]
+            columns = schema.batch_columns(self.generator, 500, valid=False)
+            self.assertTrue(all(value < 0 for value in columns["wert"]))
+            self.assertTrue(all(re.match(r"^GS-\d{4}$", code) for code in columns["code"]))
+            # Muster werden je Datensatz gezogen, nicht aus einem Pool fester Größe
+            cards = self.generator.generate_batch("kundenkarte", 20000)
+            self.assertGreater(cards["kartennummer"].nunique(), 19900)
+            self.assertTrue(cards["kartennummer"].str.fullmatch(r"KK-\d{8}").all())
+            with self.assertRaises(ValueError):
+                RecordSchema({"name": "kaputt", "felder": {"x": {"ganzzahl": [5, 1]}}})
+            with self.assertRaises(ValueError):
+                RecordSchema({"name": "profil", "felder": {"x": {"wert": 1}}})
+            # Fehlerhafte Angaben werden schon beim Laden abgelehnt
+            for spec in [{"faker": "gibt_es_nicht"}, {"faker": "date", "argumente": {"falsch": 1}},
+                         {"auswahl": []}, {"auswahl": ["a", "b"], "gewichte": [1, -1]},
+                         {"bool": 1.5}, {"bool": "ja"}]:
+                with self.assertRaises(ValueError):
+                    RecordSchema({"name": "kaputt", "felder": {"x": spec}})
+            # Kompilierte Erzeuger werden je Generator wiederverwendet, auch nach reseed
+            factories = schema.record_factories(self.generator)
+            self.generator.reseed(7)
+            self.assertIs(schema.record_factories(self.generator)[0], factories[0])
+            first = [factories[0]() for _ in range(5)]
+            self.generator.reseed(7)
+            self.assertEqual([factories[0]() for _ in range(5)], first)
+            self.log_result("test_schema_batch_and_validation", "Passed")
+        except AssertionError as e:
+            self.log_result("test_schema_batch_and_validation", "Failed", str(e))
+
+    def test_generate_relational_foreign_keys(self):
+        # Alle Bestellungen und Registrierungen verweisen auf existierende Profile
+        try:
+            tables = TestDataGenerator(seed=5).generate_relational(200, 5000, zipf_exponent=1.2)
+            profile_ids = set(tables['profile']['profil_id'])
+            self.assertEqual(len(profile_ids), 200)
+            self.assertEqual(list(tables['registrierungen']['profil_id']), list(tables['profile']['profil_id']))
+            self.assertTrue(set(tables['bestellungen']['profil_id']) <= profile_ids)
+            # Zipf-Verteilung: der häufigste Kunde hat deutlich mehr Bestellungen als der Durchschnitt
+            counts = tables['bestellungen']['profil_id'].value_counts()
+            self.assertGreater(counts.max(), 10 * 5000 / 200)
+            # Über den Index abgeleitet: Anzahl der Bestellungen je Profil und laufende Nummer beim Kunden
+            profiles = tables['profile'].set_index('profil_id')
+            self.assertTrue((profiles['anzahl_bestellungen'].loc[counts.index] == counts).all())
+            self.assertEqual(profiles['anzahl_bestellungen'].sum(), 5000)
+            orders = tables['bestellungen']
+            expected = orders.groupby('profil_id').cumcount() + 1
+            self.assertEqual(orders['kundenbestellung_nr'].tolist(), expected.tolist())
+            # Pools umfassen nach einem reseed nur so viele Werte, wie die Anfrage braucht, und wachsen bei Bedarf
+            generator = TestDataGenerator(seed=5)
+            generator.generate_relational(10, 10, unique=True)
+            self.assertEqual(len(generator._pools['stadt']), 10)
+            generator.generate_relational(50, 10, unique=True)
+            self.assertEqual(len(generator._pools['stadt']), 50)
+            self.assertEqual(len(generator._pools['benutzername.teile'][0]), 50)
+            # Innerhalb der Pool-Größe wird ohne Zurücklegen gezogen, kleine Batches wiederholen keine Pool-Werte
+            generator.reseed(5)
+            self.assertEqual(generator.generate_batch('login', 500)['benutzername'].nunique(), 500)
+            # E-Mail-Adressen, Telefonnummern und Postleitzahlen sind nicht auf die Pool-Größe beschränkt
+            profiles = generator.generate_batch('profil', 10000)
+            for field in ['email', 'telefonnummer', 'postleitzahl']:
+                self.assertGreater(profiles[field].nunique(), 4000, field)
+            self.assertTrue(profiles['email'].str.fullmatch(r"[^@\s]+@[^@\s]+\.[a-z]+").all())
+            self.log_result("test_generate_relational_foreign_keys", "Passed")
+        except AssertionError as e:
+            self.log_result("test_generate_relational_foreign_keys", "Failed", str(e))
+
+    def test_generate_batch_unique(self):
+        # Eindeutige Benutzernamen und E-Mail-Adressen, auch über mehrere Batches einer Serie
+        try:
+            generator = TestDataGenerator(seed=21)
+            first = generator.generate_batch('registrierung', 50000, unique=True)['benutzername']
+            second = generator.generate_batch('login', 5000, unique=True)['benutzername']
+            self.assertTrue(first.is_unique)
+            self.assertTrue(set(first).isdisjoint(second))
+            self.assertTrue(first.str.fullmatch(r'[a-zA-Z0-9ÄÖÜäöü]{4,12}').all())
+            emails = TestDataGenerator(seed=21).generate_batch('profil', 20000, unique=True)['email']
+            self.assertTrue(emails.is_unique)
+            self.assertTrue(emails.str.fullmatch(r'[^@]+@[^@]+').all())
+            # Fortsetzung der Serie in einem anderen Generator ab einer Seriennummer
+            continued = TestDataGenerator(seed=21).generate_batch('login', 10, unique=True, unique_start=50000)
+            self.assertEqual([name[-6:] for name in continued['benutzername']], [name[-6:] for name in second[:10]])
+            # Auch ungültige Werte bleiben eindeutig
+            invalid = TestDataGenerator(seed=21).generate_batch('login', 20000, valid=False, unique=True)
+            self.assertTrue(invalid['benutzername'].is_unique)
+            self.assertTrue(TestDataGenerator(seed=21).generate_batch('profil', 20000, valid=False, unique=True)['email'].is_unique)
+            self.log_result("test_generate_batch_unique", "Passed")
+        except AssertionError as e:
+            self.log_result("test_generate_batch_unique", "Failed", str(e))
+
+    def test_mutation_engine(self):
+        # Ungültige Datensätze verletzen genau die in 'verletzte_regel' genannte Regel
+        try:
+            orders = TestDataGenerator(seed=8).generate_batch('bestellung', 20000, valid=False)
+            rules = orders['verletzte_regel']
+            quantity = orders.loc[rules == 'menge:außerhalb_bereich', 'menge']
+            self.assertFalse(quantity.between(1, 5).any())
+            price = orders.loc[rules == 'preis:außerhalb_bereich', 'preis']
+            self.assertFalse(price.between(1.0, 50.0).any())
+            self.assertTrue(orders.loc[rules == 'menge:falscher_typ', 'menge'].map(type).eq(str).all())
+            self.assertTrue(orders.loc[rules == 'produkt:leer', 'produkt'].eq('').all())
+            self.assertFalse(orders.loc[rules == 'produkt:unbekannter_wert', 'produkt'].isin(['Kaffee', 'Espresso', 'Latte', 'Cappuccino', 'Mokka']).any())
+            # Gewichte: außerhalb_bereich zählt doppelt (2 von 9)
+            self.assertAlmostEqual((rules == 'menge:außerhalb_bereich').mean(), 2 / 9, delta=0.02)
+            registrations = TestDataGenerator(seed=8).generate_batch('registrierung', 5000, valid=False)
+            mismatch = registrations['verletzte_regel'] == 'passwort_wiederholen:abweichend'
+            self.assertTrue(mismatch.any())
+            self.assertEqual(list(registrations['passwort'] != registrations['passwort_wiederholen']), list(mismatch))
+            short = registrations.loc[registrations['verletzte_regel'] == 'passwort:kürzen', 'passwort']
+            self.assertTrue(short.str.len().lt(8).all())
+            # Profile und Bestellungen der API sind nicht mehr gültig
+            invalid = self.client.get("/generate/profil/20?seed=4").json()["ungültige_daten"]
+            self.assertTrue(all(record['verletzte_regel'] for record in invalid))
+            for data_type in ('profil', 'bestellung'):
+                self.assertIn('verletzte_regel', TestDataGenerator(seed=4).record_factories(data_type)[1]())
+            # Eigene Regeln und Prüfung der Regeln
+            columns = TestDataGenerator(seed=1).mutate_columns(
+                'profil', {'alter': np.arange(18, 28)}, [{'feld': 'alter', 'operator': 'außerhalb_bereich', 'bereich': [18, 99]}])
+            self.assertTrue(((columns['alter'] < 18) | (columns['alter'] > 99)).all())
+            with self.assertRaises(ValueError):
+                TestDataGenerator(seed=1).mutate_columns('profil', {'alter': np.arange(3)}, [{'feld': 'alter', 'operator': 'vertauschen'}])
+            self.log_result("test_mutation_engine", "Passed")
+        except AssertionError as e:
+            self.log_result("test_mutation_engine", "Failed", str(e))
+
+    def test_build_index(self):
+        try:
+            offsets, positions = build_index([2, 0, 2, 1, 2], 4)
+            self.assertEqual(list(positions[offsets[2]:offsets[3]]), [0, 2, 4])
+            self.assertEqual(list(positions[offsets[3]:offsets[4]]), [])
+            self.log_result("test_build_index", "Passed")
+        except AssertionError as e:
+            self.log_result("test_build_index", "Failed", str(e))
+
+    def test_generate_relational_api(self):
+        try:
+            response = self.client.get("/generate_relational/5/8?seed=2")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.json()["bestellungen"]), 8)
+            self.assertEqual(self.client.get("/generate_relational/5000/6000").status_code, 400)
+            self.log_result("test_generate_relational_api", "Passed")
+        except AssertionError as e:
+            self.log_result("test_generate_relational_api", "Failed", str(e))
+
+    def test_record_store(self):
+        # Spaltenspeicher: kleine Ganzzahltypen, Kategorien für wiederkehrende Werte, verlustfreie Umwandlung
+        try:
+            store = TestDataGenerator(seed=3).generate_batch('bestellung', 5000, as_store=True)
+            self.assertEqual(len(store), 5000)
+            self.assertEqual(store.columns['menge'].dtype, np.int8)
+            self.assertIsInstance(store.columns['währung'], pd.Categorical)
+            self.assertIsInstance(store.columns['produkt'], pd.Categorical)
+            df = TestDataGenerator(seed=3).generate_batch('bestellung', 5000)
+            self.assertLess(store.memory_usage(), df.memory_usage(deep=True).sum())
+            self.assertEqual(store.to_pandas().astype(object).values.tolist(), df.astype(object).values.tolist())
+            records = generate_records('profil', 50, seed=1)[0]
+            self.assertEqual(list(RecordStore.from_records(records).iter_records(chunk_size=7)), records)
+            # Profile mit vielen verschiedenen Texten: mit pyarrow als Arrow-Strings deutlich kleiner als der DataFrame
+            if pa is not None:
+                store = TestDataGenerator(seed=3).generate_batch('profil', 20000, as_store=True)
+                df = TestDataGenerator(seed=3).generate_batch('profil', 20000)
+                self.assertLess(store.memory_usage(), 0.8 * df.memory_usage(deep=True).sum())
+                self.assertEqual(store.to_pandas().astype(object).values.tolist(), df.astype(object).values.tolist())
+                invalid = generate_records('profil', 200, seed=2, kinds=(False,))[0]
+                self.assertEqual(list(RecordStore.from_records(invalid).iter_records()), invalid)
+            self.log_result("test_record_store", "Passed")
+        except AssertionError as e:
+            self.log_result("test_record_store", "Failed", str(e))
+
 
 class TestExportFunctions(unittest.TestCase):
     def setUp(self):
@@ -245,6 +774,15 @@ class TestExportFunctions(unittest.TestCase):
         except AssertionError as e:
             self.log_result("test_export_json", "Failed", str(e))
 
+    def test_export_json_compact(self):
+        try:
+            # Kompaktes JSON ohne Einrückung und mit unveränderten Umlauten
+            json_data = self.generator.export_data(self.df, format='json', compact=True)
+            self.assertEqual(json_data.decode('utf-8'), '[{"produkt":"Kaffee","menge":2,"preis":"4.00 €"},{"produkt":"Espresso","menge":1,"preis":"2.00 €"}]')
+            self.log_result("test_export_json_compact", "Passed")
+        except AssertionError as e:
+            self.log_result("test_export_json_compact", "Failed", str(e))
+
     def test_export_csv(self):
         try:
             # Exportiere die Daten im CSV-Format
@@ -265,6 +803,75 @@ class TestExportFunctions(unittest.TestCase):
         except AssertionError as e:
             self.log_result("test_export_xlsx", "Failed", str(e))
 
+    def test_export_stream_text_formats(self):
+        try:
+            # Streaming-Export liefert dieselben Inhalte wie der DataFrame-Export
+            chunks = list(self.generator.iter_export(iter(self.sample_data), 'ndjson', chunk_size=1))
+            self.assertEqual(len(chunks), 2)
+            self.assertEqual([json.loads(chunk) for chunk in chunks], self.sample_data)
+            json_data = b''.join(self.generator.iter_export(iter(self.sample_data), 'json'))
+            self.assertEqual(json.loads(json_data), self.sample_data)
+            xml_data = b''.join(self.generator.iter_export(iter(self.sample_data), 'xml'))
+            self.assertEqual(xml_data, dicttoxml.dicttoxml(self.sample_data, custom_root='daten', attr_type=False))
+            quoted = [{'produkt': 'Café "Zum Hafen" & O\'Brien <Filiale>', 'menge': 1}]
+            xml_data = b''.join(self.generator.iter_export(iter(quoted), 'xml'))
+            self.assertEqual(xml_data, dicttoxml.dicttoxml(quoted, custom_root='daten', attr_type=False))
+            csv_data = b''.join(self.generator.iter_export(iter(self.sample_data), 'csv')).decode('utf-8')
+            self.assertEqual(csv_data.replace('\r\n', '\n'), 'produkt,menge,preis\nKaffee,2,4.00 €\nEspresso,1,2.00 €\n')
+            self.log_result("test_export_stream_text_formats", "Passed")
+        except AssertionError as e:
+            self.log_result("test_export_stream_text_formats", "Failed", str(e))
+
+    def test_export_stream_xlsx(self):
+        try:
+            output = io.BytesIO()
+            self.generator.export_stream(iter(self.sample_data), 'xlsx', output)
+            rows = list(load_workbook(io.BytesIO(output.getvalue())).active.values)
+            self.assertEqual(rows, [('produkt', 'menge', 'preis'), ('Kaffee', 2, '4.00 €'), ('Espresso', 1, '2.00 €')])
+            self.log_result("test_export_stream_xlsx", "Passed")
+        except AssertionError as e:
+            self.log_result("test_export_stream_xlsx", "Failed", str(e))
+
+    @unittest.skipIf(pa is None, "pyarrow nicht installiert")
+    def test_export_columnar_formats(self):
+        try:
+            import pyarrow.parquet as pq
+            parquet_data = self.generator.export_data(self.df, 'parquet', compression='zstd', row_group_size=1)
+            parquet_file = pq.ParquetFile(io.BytesIO(parquet_data))
+            self.assertEqual(parquet_file.metadata.num_row_groups, 2)
+            self.assertEqual(parquet_file.read().to_pylist(), self.sample_data)
+            arrow_data = self.generator.export_data(self.df, 'arrow')
+            self.assertEqual(pa.ipc.open_stream(arrow_data).read_all().to_pylist(), self.sample_data)
+            feather_data = self.generator.export_data(self.df, 'feather', compression='lz4')
+            self.assertEqual(pa.ipc.open_file(feather_data).read_all().to_pylist(), self.sample_data)
+            self.log_result("test_export_columnar_formats", "Passed")
+        except AssertionError as e:
+            self.log_result("test_export_columnar_formats", "Failed", str(e))
+
+    @unittest.skipIf(pa is None, "pyarrow nicht installiert")
+    def test_export_arrow_table_without_pandas(self):
+        try:
+            # Eine generierte Arrow-Tabelle wird ohne pandas-Umweg geschrieben
+            table = self.generator.generate_batch('bestellung', 100, as_arrow=True)
+            self.assertIsInstance(table, pa.Table)
+            parquet_data = self.generator.export_data(table, 'parquet')
+            import pyarrow.parquet as pq
+            self.assertTrue(pq.read_table(io.BytesIO(parquet_data)).equals(table))
+            self.log_result("test_export_arrow_table_without_pandas", "Passed")
+        except AssertionError as e:
+            self.log_result("test_export_arrow_table_without_pandas", "Failed", str(e))
+
+    @unittest.skipIf(pa is None, "pyarrow nicht installiert")
+    def test_export_record_store_arrow(self):
+        try:
+            # Kategorien werden als Arrow-Dictionary-Spalten übernommen
+            table = self.generator.generate_batch('profil', 500, as_store=True).to_arrow()
+            self.assertTrue(pa.types.is_dictionary(table.schema.field('geschlecht').type))
+            self.assertEqual(table.num_rows, 500)
+            self.log_result("test_export_record_store_arrow", "Passed")
+        except AssertionError as e:
+            self.log_result("test_export_record_store_arrow", "Failed", str(e))
+
 
 
 if __name__ == "__main__":
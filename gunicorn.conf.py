@@ -0,0 +1,9 @@
+# Gunicorn-Konfiguration für die Testdaten-API: gunicorn -c gunicorn.conf.py Testdaten_API:app
+import os
+
+bind = f"{os.environ.get('TESTDATEN_HOST', '0.0.0.0')}:{os.environ.get('TESTDATEN_PORT', 8000)}"
+workers = int(os.environ.get('WEB_CONCURRENCY', os.cpu_count() or 1))
+worker_class = 'uvicorn.workers.UvicornWorker'
+# Die App wird einmal im Master geladen und in die Worker geforkt, statt in jedem Worker neu importiert zu werden
+preload_app = True
+timeout = 120